@@ -0,0 +1,217 @@
+"""Local JSON API over the dashboard's aggregates.
+
+Serves the KPIs, the monthly turnover series and the department turnover
+rates for any sidebar filter state, computed by the same cube, filter and
+headcount code as the dashboard:
+
+    python api.py --port 8502
+    curl 'http://localhost:8502/kpis?Gender=انثى&AgeGroup=21-25&AgeGroup=26-35'
+
+Filters use the sidebar's column names (Gender, Department, Unit,
+ResignationReason, AgeGroup, MaritalStatus); repeat a parameter to select
+several values. A parameter left out keeps the sidebar's initial state, so
+like the dashboard, rows with no ResignationReason, AgeGroup or
+MaritalStatus are only counted when the filter is off. Requests are handled on
+a thread pool. Responses are cached in memory per dataset version and filter
+state and carry an ETag of both, so pollers get ``304 Not Modified`` until
+the data changes.
+"""
+import hashlib
+import json
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from charts import department_turnover
+from cube import build_cube, count_by, mean_work_duration, totals
+from data_loader import dataset_version, load_data
+from filters import FILTER_COLUMNS, FilterIndex, default_selections, normalize
+from headcount import headcount_table, monthly_totals
+from ingest import DATA_DIR, IncrementalDataset
+from sql_store import BACKEND, open_store
+from view_cache import ViewCache
+
+FILE_PATH = "Simple HR Data.xlsx"
+SHEET_NAME = "الدوران + معدل البقاء"
+API_WORKERS = int(os.environ.get('HR_API_WORKERS', 8))
+
+
+class Aggregates:
+    """The filterable dataset of the current version, reloaded when it changes."""
+
+    def __init__(self, file_path=FILE_PATH, sheet_name=SHEET_NAME):
+        self.file_path = file_path
+        self.sheet_name = sheet_name
+        self.version = None
+        self._lock = threading.Lock()
+        self._incremental = IncrementalDataset(DATA_DIR, sheet_name) if DATA_DIR else None
+
+    def current(self):
+        """Return ``(version, make_view, source)`` for the latest data."""
+        with self._lock:
+            if self._incremental is not None:
+                version, cube, filter_index = self._incremental.refresh()
+            else:
+                version, cube, filter_index = dataset_version(self.file_path, self.sheet_name), None, None
+            if version != self.version:
+                self._load(version, cube, filter_index)
+            return self.version, self._make_view, self._source
+
+    def _load(self, version, cube, filter_index=None):
+        if cube is None and BACKEND == 'pandas':
+            cube = build_cube(load_data(self.file_path, self.sheet_name, version))
+        if cube is not None:
+            # Bound locally: a request still holding this make_view must keep
+            # masking with this version's index after the next reload
+            source = filter_index or FilterIndex(cube)
+            self._source = source
+            self._make_view = lambda selections: cube[source.mask(selections)]
+        else:
+            self._source = open_store(self.file_path, self.sheet_name, BACKEND, version)
+            self._make_view = self._source.view
+        self.version = version
+
+
+def kpis(view):
+    mean = mean_work_duration(view)
+    return {
+        'leavers': int(totals(view)['Count']),
+        'departments': len(count_by(view, 'Department')),
+        'mean_work_duration': None if math.isnan(mean) else float(mean),
+    }
+
+
+def monthly_turnover(view):
+    return _records(monthly_totals(headcount_table(view)))
+
+
+def department_rates(view):
+    return _records(department_turnover(view))
+
+
+ENDPOINTS = {
+    '/kpis': kpis,
+    '/turnover/monthly': monthly_turnover,
+    '/turnover/departments': department_rates,
+}
+
+
+def _records(frame):
+    return json.loads(frame.to_json(orient='records', date_format='iso'))
+
+
+def parse_selections(query, source):
+    """Sidebar-style selections from a query string; raises ValueError on unknown values.
+
+    Columns missing from the query keep their ``default_selections`` value.
+    """
+    params = parse_qs(query, keep_blank_values=True)
+    unknown = set(params) - set(FILTER_COLUMNS)
+    if unknown:
+        raise ValueError(f"unknown filter {sorted(unknown)}; expected {FILTER_COLUMNS}")
+    selections = default_selections(source)
+    for column, requested in params.items():
+        # Query strings are text; Department values may be numbers
+        allowed = {str(value): value for value in source.values(column)}
+        missing = [value for value in requested if value and value not in allowed]
+        if missing:
+            raise ValueError(f"unknown {column} values {missing}")
+        # Repeated parameters select a value once and do not change the cache key
+        selections[column] = [allowed[value] for value in dict.fromkeys(requested) if value]
+    return selections
+
+
+class Handler(BaseHTTPRequestHandler):
+    aggregates = None
+    cache = None
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        endpoint = ENDPOINTS.get(url.path)
+        if url.path == '/version':
+            return self._send(200, json.dumps({'version': self.aggregates.current()[0]}).encode())
+        if endpoint is None:
+            return self._send(404, json.dumps({'error': f"unknown path; expected one of {sorted(ENDPOINTS)}"}).encode())
+
+        version, make_view, source = self.aggregates.current()
+        try:
+            selections = parse_selections(url.query, source)
+        except ValueError as exc:
+            return self._send(400, json.dumps({'error': str(exc)}, ensure_ascii=False).encode('utf-8'))
+
+        key = (version, url.path, normalize(selections))
+        etag = '"%s-%s"' % (version, hashlib.sha256(repr(key).encode('utf-8')).hexdigest()[:16])
+        if self.headers.get('If-None-Match') == etag:
+            return self._send(304, b'', etag)
+        body, _, _ = self.cache.get_or_build(key, lambda: json.dumps(
+            {'version': version, 'filters': selections, 'data': endpoint(make_view(selections))},
+            ensure_ascii=False, default=str).encode('utf-8'))
+        self._send(200, body, etag)
+
+    def _send(self, status, body, etag=None):
+        self.send_response(status)
+        if status != 304:
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+        if etag:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer that hands each connection to a fixed thread pool."""
+
+    def __init__(self, address, handler, workers=API_WORKERS):
+        super().__init__(address, handler)
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix='hr-api')
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=False)
+
+
+def make_server(host='127.0.0.1', port=8502, aggregates=None, cache=None, workers=API_WORKERS):
+    handler = type('BoundHandler', (Handler,), {
+        'aggregates': aggregates or Aggregates(),
+        'cache': cache or ViewCache(),
+    })
+    return PooledHTTPServer((host, port), handler, workers)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve the dashboard aggregates as JSON.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8502)
+    parser.add_argument('--workers', type=int, default=API_WORKERS)
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, workers=args.workers)
+    print(f"serving on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,159 @@
+"""Benchmark every stage of the dashboard on synthetic workbooks.
+
+Each stage (parse, rename and date conversion, compaction, derived columns,
+cube, filter index, filter resolution, every tab and the word cloud) is
+timed on its own, and the peak memory it allocates on top of what was
+already held is traced with tracemalloc. Results are written as JSON so
+runs from different versions can be compared:
+
+    python benchmark.py --sizes 10k 100k --out bench.json
+    python benchmark.py --sizes 10k 100k --compare bench.json
+
+Workbooks are generated once per size and seed (see synthetic.py) and kept
+in ``CACHE_DIR``. Tracing memory slows Python-heavy stages down; pass
+``--no-memory`` for timings only. Each result records which mode was used.
+"""
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+
+import pandas as pd
+
+from charts import TAB_TITLES, build_tab
+from cube import build_cube, count_by
+from data_loader import (
+    CACHE_DIR, COLUMNS, RENAME_DICT, _type_columns, _wanted, compact_frame, derive_features,
+)
+from filters import FilterIndex
+from synthetic import SHEET_NAME, SIZES, write_workbook
+from word_cloud import _render, reason_tokens, render_png, word_frequencies
+
+
+class Stages:
+    """Collects ``{stage, seconds, peak_bytes}`` records."""
+
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.records = []
+
+    def run(self, name, func, *args, **kwargs):
+        if self.memory:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        result = func(*args, **kwargs)
+        seconds = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1] - baseline if self.memory else None
+        self.records.append({'stage': name, 'seconds': round(seconds, 6), 'peak_bytes': peak})
+        return result
+
+
+def workbook_path(size, seed):
+    path = os.path.join(CACHE_DIR, f"synthetic-{size}-{seed}.xlsx")
+    if not os.path.exists(path):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp.xlsx"
+        write_workbook(tmp_path, SIZES.get(size) or int(size), seed)
+        os.replace(tmp_path, path)
+    return path
+
+
+def _parse(path):
+    return pd.read_excel(path, sheet_name=SHEET_NAME, usecols=lambda header: _wanted(header, COLUMNS))
+
+
+def _rename_and_dates(df):
+    df.columns = df.columns.str.strip()
+    return _type_columns(df.rename(columns=RENAME_DICT))
+
+
+def _filter(cube, filter_index):
+    # A spread of filter states like the sidebar produces, resolved cold
+    states = [{}, {'Gender': filter_index.values('Gender')[:1]}]
+    states += [{'Department': [value]} for value in filter_index.values('Department')[:10]]
+    states.append({'ResignationReason': filter_index.values('ResignationReason')[:5],
+                   'AgeGroup': filter_index.values('AgeGroup')[:3]})
+    filter_index.cache_clear()
+    return [cube[filter_index.mask(selections)] for selections in states]
+
+
+def _word_cloud(view):
+    reason_tokens.cache_clear()
+    _render.cache_clear()
+    return render_png(word_frequencies(count_by(view, 'ResignationReason')))
+
+
+def bench_size(size, seed=0, memory=True):
+    path = workbook_path(size, seed)
+    stages = Stages(memory)
+    if memory:
+        tracemalloc.start()
+    try:
+        df = stages.run('excel_parse', _parse, path)
+        df = stages.run('rename_and_dates', _rename_and_dates, df)
+        df = stages.run('compact', compact_frame, df)
+        df = stages.run('derive_features', derive_features, df)
+        cube = stages.run('build_cube', build_cube, df)
+        filter_index = stages.run('filter_index', FilterIndex, cube)
+        stages.run('filter', _filter, cube, filter_index)
+        reason_tokens.cache_clear()
+        _render.cache_clear()
+        for index in range(len(TAB_TITLES)):
+            stages.run(f"tab_{index:02d}", build_tab, index, cube)
+        stages.run('word_cloud', _word_cloud, cube)
+    finally:
+        if memory:
+            tracemalloc.stop()
+    return {'size': size, 'rows': len(df), 'cube_rows': cube.sizes(), 'seed': seed,
+            'memory_traced': memory, 'stages': stages.records}
+
+
+def _revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline):
+    """Print the time ratio of every stage against a previous results file."""
+    old = {(run['size'], record['stage']): record['seconds']
+           for run in baseline['runs'] for record in run['stages']}
+    for run in results['runs']:
+        for record in run['stages']:
+            before = old.get((run['size'], record['stage']))
+            if before:
+                print(f"{run['size']:>5} {record['stage']:<18} {before:9.4f}s -> {record['seconds']:9.4f}s "
+                      f"x{record['seconds'] / before:5.2f}")
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Time every dashboard stage on synthetic data.")
+    parser.add_argument('--sizes', nargs='+', default=['10k', '100k'], help="e.g. 10k 100k 1M")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default=None, help="write the results JSON here")
+    parser.add_argument('--compare', default=None, help="results JSON of an earlier run")
+    parser.add_argument('--no-memory', dest='memory', action='store_false', help="skip tracemalloc")
+    args = parser.parse_args()
+
+    results = {
+        'revision': _revision(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'runs': [bench_size(size, args.seed, args.memory) for size in args.sizes],
+    }
+    text = json.dumps(results, indent=1)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(text)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(results, json.load(f))
+    elif not args.out:
+        print(text)
@@ -0,0 +1,347 @@
+"""Tab builders for the dashboard.
+
+Each ``tab_*`` function takes the filtered cube and returns the tab's content
+as a list of ``(kind, payload)`` blocks, e.g. ``("plotly", fig)``,
+``("table", (frame, formats))`` or ``("info", text)``. Nothing here talks to Streamlit, so a tab is only built
+when it is actually shown and its blocks can be kept and rendered again.
+"""
+import pandas as pd
+import plotly.express as px
+
+from cube import count_by, rollup, totals
+from data_loader import month_map
+from headcount import headcount_table, monthly_totals, period_turnover
+
+# Define your color palette
+palette = {
+    "darkest": "#0d1b2a",
+    "dark": "#1b263b",
+    "medium": "#415a77",
+    "light": "#778da9",
+    "offwhite": "#e0e1dd"
+}
+
+# Define Plotly color sequence from your palette
+color_sequence = [palette['medium'], palette['light'], palette['dark'], palette['darkest'], palette['offwhite']]
+
+TAB_TITLES = [
+    "📌 أسباب الاستقالة",
+    "👥 توزيع الجنس",
+    "☁️ سحابة الكلمات",
+    "📊 شريحة العمر",
+    "💍 الحالة الاجتماعية",
+    "📅 شهر الميلاد",
+    "📈 معدل الدوران الشهري",
+    "🏢 الدوران حسب القسم والوحدة",
+    "📅 الموظفون الجدد مقابل المستقيلين",
+    "⏳ مدة العمل حسب القسم والجنس",
+    "🚩 أقسام عالية الدوران",
+    "📊 تحليلات إضافية"
+]
+
+
+def duration_histogram(view, title, color):
+    """WorkDuration histogram drawn from the cube's pre-binned counts.
+
+    Only one bar per bucket is sent to the browser instead of every row.
+    """
+    bins = rollup(view, ['TenureBucketStart', 'TenureBucketEnd'], dropna=True)['Count'].reset_index()
+    bins = bins[bins['Count'] > 0]
+    # Columns of a frame rather than bare Series, so a view without any
+    # WorkDuration (e.g. every reason deselected) draws an empty chart
+    bars = pd.DataFrame({'x': (bins['TenureBucketStart'] + bins['TenureBucketEnd']) / 2, 'y': bins['Count']})
+    fig = px.bar(
+        bars,
+        x='x',
+        y='y',
+        title=title,
+        color_discrete_sequence=[color]
+    )
+    fig.update_traces(width=bins['TenureBucketEnd'] - bins['TenureBucketStart'])
+    fig.update_layout(bargap=0)
+    return fig
+
+
+# Tab 0: Resignation reasons pie
+def tab_reasons(view):
+    reason_counts = count_by(view, "ResignationReason", "غير محدد").reset_index()
+    reason_counts.columns = ['ResignationReason', 'Count']
+    fig = px.pie(
+        reason_counts,
+        names="ResignationReason",
+        values="Count",
+        title="توزيع أسباب الاستقالة    ",
+        hole=0.45,
+        color_discrete_sequence=color_sequence
+    )
+    fig.update_layout(title={'x': 1, 'xanchor': 'right'}, legend=dict(x=1, xanchor='right'))
+    fig.update_traces(textposition='inside', textinfo='percent+label')
+    return [("plotly", fig)]
+
+
+# Tab 1: Gender distribution
+def tab_gender(view):
+    gender_counts = count_by(view, 'Gender', "غير محدد").reset_index()
+    gender_counts.columns = ['Gender', 'Count']
+    fig = px.bar(
+        gender_counts,
+        x='Gender',
+        y='Count',
+        text_auto=True,
+        title="توزيع المستقيلين حسب الجنس    ",
+        color_discrete_sequence=color_sequence
+    )
+    fig.update_layout(title={'x': 1, 'xanchor': 'right'}, xaxis_title = 'الجنس', yaxis_title='عدد المستقيلين')
+    return [("plotly", fig)]
+
+
+# Tab 2: Word cloud of resignation reasons
+def tab_word_cloud(view):
+    # wordcloud pulls in matplotlib, so only this tab pays for the import
+    from word_cloud import render_png, word_frequencies
+
+    blocks = [("markdown", "### سحابة الكلمات لأسباب الاستقالة    ")]
+
+    # Per-reason token counts are precomputed; only the weighting depends on the filters
+    frequencies = word_frequencies(count_by(view, 'ResignationReason'))
+
+    if frequencies:
+        try:
+            blocks.append(("image", render_png(frequencies)))
+        except ValueError:
+            blocks.append(("warning", "لا توجد كلمات كافية لتوليد سحابة كلمات."))
+    else:
+        blocks.append(("warning", "لا توجد بيانات صالحة لتوليد سحابة كلمات."))
+    return blocks
+
+
+# Tab 3: Age group + WorkDuration
+def tab_age_group(view):
+    age_counts = count_by(view, 'AgeGroup', "غير محدد").reset_index()
+    age_counts.columns = ['AgeGroup', 'Count']
+    fig1 = px.bar(
+        age_counts,
+        x='AgeGroup',
+        y='Count',
+        text_auto=True,
+        title="توزيع المستقيلين حسب شريحة العمر    ",
+        color_discrete_sequence=color_sequence
+    )
+    fig1.update_layout(title={'x': 1, 'xanchor': 'right'}, xaxis_title = 'شريحة العمر', yaxis_title='عدد المستقيلين')
+    blocks = [("plotly", fig1)]
+
+    if 'TenureBucketStart' in view.columns:
+        fig2 = duration_histogram(view, "توزيع فترة العمل    ", palette['medium'])
+        fig2.update_layout(title={'x': 1, 'xanchor': 'right'}, xaxis_title = 'فترة العمل (شهور)', yaxis_title='عدد المستقيلين')
+        blocks.append(("plotly", fig2))
+    return blocks
+
+
+# Tab 4: Marital status pie
+def tab_marital_status(view):
+    ms_counts = count_by(view, 'MaritalStatus', "غير محدد").reset_index()
+    ms_counts.columns = ['MaritalStatus', 'Count']
+    fig = px.pie(
+        ms_counts,
+        names='MaritalStatus',
+        values='Count',
+        title="الحالة الاجتماعية    ",
+        hole=0.4,
+        color_discrete_sequence=color_sequence
+    )
+    fig.update_layout(title={'x': 1, 'xanchor': 'right'}, xaxis_title = 'الحالة الاجتماعية', yaxis_title='عدد المستقيلين')
+    return [("plotly", fig)]
+
+
+# Tab 5: Birth month bar
+def tab_birth_month(view):
+    birth_month_counts = rollup(view, 'BirthMonthName', dropna=True)['Count']
+    bm_ordered = [month_map[i] for i in range(1, 13)]
+    counts = birth_month_counts.reindex(bm_ordered, fill_value=0).reset_index()
+    counts.columns = ['BirthMonthName', 'Count']
+    fig = px.bar(
+        counts,
+        x='BirthMonthName',
+        y='Count',
+        text_auto=True,
+        title="عدد المستقيلين حسب شهر الميلاد    ",
+        color_discrete_sequence=color_sequence
+    )
+    fig.update_layout(title={'x': 1, 'xanchor': 'right'}, xaxis_title = 'الشهر', yaxis_title='عدد المستقيلين')
+    return [("plotly", fig)]
+
+
+def department_turnover(view):
+    """Annualized headcount-based turnover rate (%) per department."""
+    return period_turnover(headcount_table(view, by=['Department']))
+
+
+# Tab 6: Monthly turnover trend (leavers count and headcount-based rate)
+def tab_monthly_turnover(view):
+    monthly_counts = monthly_totals(headcount_table(view)).rename(columns={'Leavers': 'LeaversCount'})
+    fig = px.line(
+        monthly_counts,
+        x='YearMonth',
+        y='LeaversCount',
+        markers=True,
+        title='معدل الدوران الشهري    ',
+        color_discrete_sequence=[palette['medium']]
+    )
+    fig.update_layout(title={'x': 1, 'xanchor': 'right'}, xaxis_title='الشهر', yaxis_title='عدد المستقيلين')
+
+    fig_rate = px.line(
+        monthly_counts,
+        x='YearMonth',
+        y='TurnoverRate',
+        markers=True,
+        title='معدل الدوران الشهري (% من متوسط عدد الموظفين)    ',
+        color_discrete_sequence=[palette['dark']]
+    )
+    fig_rate.update_layout(title={'x': 1, 'xanchor': 'right'}, xaxis_title='الشهر', yaxis_title='معدل الدوران (%)')
+    return [("plotly", fig), ("plotly", fig_rate)]
+
+
+# Tab 7: Turnover by Department and Unit
+def tab_department_unit(view):
+    dept_unit_counts = rollup(view, ['Department', 'Unit'], dropna=True)['Leavers']
+    dept_unit_counts = dept_unit_counts[dept_unit_counts > 0].reset_index(name='LeaversCount')
+    fig = px.bar(
+        dept_unit_counts,
+        x='Department',
+        y='LeaversCount',
+        color='Unit',
+        barmode='group',
+        title='الدوران حسب القسم والوحدة    ',
+        color_discrete_sequence=color_sequence
+    )
+    fig.update_layout(title={'x': 1, 'xanchor': 'right'}, xaxis_title = 'القسم', yaxis_title='عدد المستقيلين')
+    return [("plotly", fig)]
+
+
+# Tab 8: New hires vs leavers by month
+def tab_hires_vs_leavers(view):
+    combined = monthly_totals(headcount_table(view)).rename(columns={'Hires': 'NewHires'})
+    fig = px.line(
+        combined,
+        x='YearMonth',
+        y=['NewHires', 'Leavers'],
+        markers=True,
+        title='الموظفون الجدد مقابل المستقيلين    ',
+        color_discrete_sequence=[palette['medium'], palette['light']]
+    )
+    fig.update_layout(title={'x': 1, 'xanchor': 'right'}, xaxis_title='الشهر', yaxis_title='عدد الموظفين')
+    return [("plotly", fig)]
+
+
+# Tab 9: Avg work duration by Dept and Gender
+def tab_duration_by_department(view):
+    if totals(view)['WorkDurationCount'] > 0:
+        dept_gender = rollup(view, ['Department', 'Gender'], dropna=True)
+        avg_duration = (dept_gender['WorkDurationSum'] / dept_gender['WorkDurationCount']).reset_index(name='WorkDuration')
+        fig = px.bar(
+            avg_duration,
+            x='Department',
+            y='WorkDuration',
+            color='Gender',
+            barmode='group',
+            title='متوسط فترة العمل حسب القسم والجنس    ',
+            text_auto='.1f',
+            color_discrete_sequence=color_sequence
+        )
+        fig.update_layout(title={'x': 1, 'xanchor': 'right'}, xaxis_title = 'القسم', yaxis_title='متوسط فترة العمل (شهور)')
+        return [("plotly", fig)]
+    return [("info", "لا توجد بيانات كافية لفترة العمل.")]
+
+
+# Tab 10: High turnover departments alert
+def tab_high_turnover(view, turnover_threshold=20):
+    turnover_rates = department_turnover(view)
+    high_turnover = turnover_rates[turnover_rates['TurnoverRate'] >= turnover_threshold].sort_values('TurnoverRate', ascending=False)
+
+    blocks = [("markdown", f"###  الأقسام التي لديها معدل دوران أعلى من%{turnover_threshold}")]
+    if not high_turnover.empty:
+        blocks.append(("table", (high_turnover, {"TurnoverRate": "{:.2f}%"})))
+        fig = px.bar(
+            high_turnover,
+            x='Department',
+            y='TurnoverRate',
+            title='الأقسام ذات معدل الدوران العالي    ',
+            color_discrete_sequence=[palette['dark']]
+        )
+        fig.update_layout(title={'x': 1, 'xanchor': 'right'}, xaxis_title='القسم',yaxis_title='معدل الدوران (%)')
+        blocks.append(("plotly", fig))
+    else:
+        blocks.append(("info", "لا توجد أقسام تتجاوز حد معدل الدوران المحدد."))
+    return blocks
+
+
+# Tab 11: Advanced Insights
+def tab_advanced(view):
+    # The WorkDuration histogram lives in the age group tab only
+    blocks = [("markdown", "### 📌 نسبة الاستقالات المبكرة (قبل 4.4 أشهر)")]
+    early_leave_counts = count_by(view, 'LeaveBefore4_4', "كلا").reset_index()
+    early_leave_counts.columns = ['LeaveBefore4_4', 'Count']
+    fig = px.pie(
+        early_leave_counts,
+        names="LeaveBefore4_4",
+        values="Count",
+        hole=0.4,
+        title="الترك قبل 4.4 أشهر",
+        color_discrete_sequence=["#1b263b", "#778da9"]
+    )
+    fig.update_layout(title={'x': 1, 'xanchor': 'right'})
+    blocks.append(("plotly", fig))
+
+    blocks.append(("markdown", "### 👔 عدد المستقيلين حسب المسمى الوظيفي"))
+    job_counts = count_by(view, 'JobTitle').reset_index()
+    job_counts.columns = ['JobTitle', 'Count']
+    fig = px.bar(
+        job_counts,
+        x='JobTitle',
+        y='Count',
+        text_auto=True,
+        title="عدد المستقيلين حسب المسمى الوظيفي",
+        color_discrete_sequence=["#778da9"]
+    )
+    fig.update_layout(title={'x': 1, 'xanchor': 'right'}, xaxis_title="المسمى الوظيفي", yaxis_title="عدد")
+    blocks.append(("plotly", fig))
+
+    blocks.append(("markdown", "### 📊 أسباب الاستقالة حسب شريحة العمر"))
+    if 'ResignationReason' in view.columns and 'AgeGroup' in view.columns:
+        reason_age_df = rollup(view, ['AgeGroup', 'ResignationReason'], dropna=True)['Count']
+        reason_age_df = reason_age_df[reason_age_df > 0].reset_index(name='Count')
+        fig = px.bar(
+            reason_age_df,
+            x='AgeGroup',
+            y='Count',
+            color='ResignationReason',
+            barmode='stack',
+            text_auto=True,
+            title="أسباب الاستقالة حسب شريحة العمر",
+            color_discrete_sequence=["#415a77", "#778da9", "#1b263b"]
+        )
+        fig.update_layout(title={'x': 1, 'xanchor': 'right'}, xaxis_title="شريحة العمر", yaxis_title="عدد المستقيلين")
+        blocks.append(("plotly", fig))
+    return blocks
+
+
+# In the same order as TAB_TITLES
+TAB_BUILDERS = [
+    tab_reasons,
+    tab_gender,
+    tab_word_cloud,
+    tab_age_group,
+    tab_marital_status,
+    tab_birth_month,
+    tab_monthly_turnover,
+    tab_department_unit,
+    tab_hires_vs_leavers,
+    tab_duration_by_department,
+    tab_high_turnover,
+    tab_advanced,
+]
+
+
+def build_tab(index, view, **options):
+    """Build one tab's blocks; ``options`` go to builders that take them."""
+    return TAB_BUILDERS[index](view, **options)
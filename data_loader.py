@@ -0,0 +1,278 @@
+"""Workbook loading with an on-disk Parquet sidecar.
+
+Parsing the Excel workbook with openpyxl is by far the slowest part of a
+rerun, so the typed and renamed frame is written once to a Parquet file in
+``CACHE_DIR`` and re-read from there until the source workbook changes.
+"""
+import hashlib
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIR = ".hr_cache"
+
+# Bump when the layout of the cached frame changes so old sidecars are ignored
+SCHEMA_VERSION = 5
+
+# Rename dict matching the workbook headers
+RENAME_DICT = {
+    'الرقم': 'EmployeeID',
+    'اسم الموظف': 'EmployeeName',
+    'المسمى الوظيفي': 'JobTitle',
+    'المسمى': 'Position',
+    'القسم': 'Department',
+    'الإدارة': 'Unit',
+    'تاريخ بدء العمل': 'DateOfStart',
+    'تاريخ الترك': 'DateOfLeaving',
+    'الجنس': 'Gender',
+    'تاريخ الميلاد': 'BirthDate',
+    'الحالة الاجتماعية': 'MaritalStatus',
+    'فترة العمل': 'WorkDuration',
+    'الترك قبل 4.4': 'LeaveBefore4_4',
+    'العمر عند الترك': 'AgeAtExit',
+    'شريحة العمر': 'AgeGroup',
+    'الشهر': 'Month',
+    'السبب': 'ResignationReason',
+    'Turn Over': 'Turnover',
+    'معدل المدة': 'TimeAvg',
+    'RN Turn Over': 'RN_Turnover'
+}
+
+DATE_COLUMNS = ['BirthDate', 'DateOfStart', 'DateOfLeaving']
+
+# Only the columns the dashboard actually reads are kept
+CATEGORY_COLUMNS = ['Gender', 'Department', 'Unit', 'ResignationReason', 'AgeGroup',
+                    'MaritalStatus', 'JobTitle', 'LeaveBefore4_4']
+NUMERIC_COLUMNS = ['WorkDuration', 'AgeAtExit']
+
+# Labels that are text even where a file or chunk holds only numbers (LeaveBefore4_4 mixes 0 and "نعم")
+TEXT_COLUMNS = ['LeaveBefore4_4']
+COLUMNS = CATEGORY_COLUMNS + NUMERIC_COLUMNS + DATE_COLUMNS
+
+month_map = {
+    1: "يناير", 2: "فبراير", 3: "مارس", 4: "أبريل",
+    5: "مايو", 6: "يونيو", 7: "يوليو", 8: "أغسطس",
+    9: "سبتمبر", 10: "أكتوبر", 11: "نوفمبر", 12: "ديسمبر"
+}
+
+# Width of the WorkDuration buckets used by the histograms (half a year).
+# Fixed, so a row's bucket never depends on the rest of the data
+TENURE_BUCKET_WIDTH = 0.5
+
+# Rows per chunk when streaming a workbook
+CHUNK_SIZE = 50_000
+
+# (path, mtime_ns, size) -> sha256, so unchanged files are hashed once per process
+_hash_memo = {}
+
+
+def _content_hash(file_path, mtime_ns, size):
+    key = (file_path, mtime_ns, size)
+    if key not in _hash_memo:
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        _hash_memo[key] = digest.hexdigest()
+    return _hash_memo[key]
+
+
+def dataset_version(file_path, sheet_name):
+    """Return a short key identifying this exact workbook/sheet.
+
+    The key is built from the absolute path, the modification time and a
+    hash of the file contents, so editing or replacing the workbook yields a
+    new version while reruns against the same file keep the old one.
+    """
+    file_path = os.path.abspath(file_path)
+    stat = os.stat(file_path)
+    content = _content_hash(file_path, stat.st_mtime_ns, stat.st_size)
+    raw = f"{file_path}|{sheet_name}|{stat.st_mtime_ns}|{content}|{SCHEMA_VERSION}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:16]
+
+
+def _wanted(header, columns):
+    # Some headers carry stray whitespace (e.g. " RN Turn Over")
+    header = str(header).strip()
+    return RENAME_DICT.get(header, header) in columns
+
+
+def parse_workbook(file_path, sheet_name, columns=COLUMNS):
+    """Parse the sheet and return the renamed, typed frame.
+
+    Pass ``columns=None`` to keep every column with its original dtypes
+    (used by the memory report).
+    """
+    usecols = None if columns is None else (lambda header: _wanted(header, columns))
+    df = pd.read_excel(file_path, sheet_name=sheet_name, usecols=usecols)
+    df.columns = df.columns.str.strip()
+    df = _type_columns(df.rename(columns=RENAME_DICT))
+
+    if columns is not None:
+        df = derive_features(compact_frame(df))
+    return df
+
+
+def _type_columns(df):
+    # Convert dates safely
+    for col in DATE_COLUMNS:
+        df[col] = pd.to_datetime(df[col], errors='coerce')
+
+    # Mixed int/str columns (e.g. LeaveBefore4_4 holds 0 and "نعم") cannot be
+    # stored in Parquet, so keep them as text the same way the charts show them
+    for col in df.columns[(df.dtypes == object) | df.columns.isin(TEXT_COLUMNS)]:
+        df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+
+    # A blank cell turns a column of integer labels (Department) into floats;
+    # keep them integers so every chunk and file gives the same categories
+    for col in df.columns[df.columns.isin(CATEGORY_COLUMNS)]:
+        values = df[col]
+        if pd.api.types.is_float_dtype(values) and (values.dropna() % 1 == 0).all():
+            # Through object, so the categories come out int64 like a chunk without blanks
+            df[col] = values.astype('Int64').astype(object)
+    return df
+
+
+def iter_workbook_chunks(file_path, sheet_name, chunksize=CHUNK_SIZE, columns=COLUMNS):
+    """Stream the sheet as typed frames of at most ``chunksize`` rows.
+
+    Rows are read with openpyxl in read-only mode, so memory stays bounded
+    by the chunk size. Chunks carry every derived column.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = workbook[sheet_name].iter_rows(values_only=True)
+        header = [RENAME_DICT.get(str(h).strip(), str(h).strip()) for h in next(rows, ())]
+        keep = [i for i, name in enumerate(header) if name in columns]
+        names = [header[i] for i in keep]
+
+        batch = []
+        for row in rows:
+            values = [row[i] if i < len(row) else None for i in keep]
+            if all(value is None for value in values):
+                continue
+            batch.append(values)
+            if len(batch) == chunksize:
+                yield _prepare_chunk(pd.DataFrame(batch, columns=names))
+                batch = []
+        if batch:
+            yield _prepare_chunk(pd.DataFrame(batch, columns=names))
+    finally:
+        workbook.close()
+
+
+def _prepare_chunk(df):
+    return derive_features(compact_frame(_type_columns(df)))
+
+
+def compact_frame(df):
+    """Shrink dtypes: categoricals for labels, float32 for measures."""
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce', downcast='float')
+    return df
+
+
+def _month_start(dates):
+    # Truncate to the first of the month in one vectorized cast; NaT stays NaT
+    return pd.Series(dates.to_numpy().astype('datetime64[M]').astype('datetime64[ns]'), index=dates.index)
+
+
+def derive_features(df):
+    """Add every derived column the tabs read, once per dataset version.
+
+    StartMonth/LeavingMonth are the month of DateOfStart/DateOfLeaving,
+    BirthMonthName is an ordered categorical of month names, and
+    TenureBucketStart/TenureBucketEnd are the edges of the fixed-width
+    WorkDuration bucket each row falls in.
+    """
+    df['StartMonth'] = _month_start(df['DateOfStart'])
+    df['LeavingMonth'] = _month_start(df['DateOfLeaving'])
+    df['BirthMonthName'] = pd.Categorical(
+        df['BirthDate'].dt.month.map(month_map),
+        categories=[month_map[i] for i in range(1, 13)],
+        ordered=True,
+    )
+    return add_tenure_buckets(df)
+
+
+def add_tenure_buckets(df):
+    """Set TenureBucketStart/End, ``TENURE_BUCKET_WIDTH`` apart; missing WorkDuration stays empty."""
+    start = np.floor(df['WorkDuration'].to_numpy(dtype='float64') / TENURE_BUCKET_WIDTH) * TENURE_BUCKET_WIDTH
+    df['TenureBucketStart'] = start.astype('float32')
+    df['TenureBucketEnd'] = (start + TENURE_BUCKET_WIDTH).astype('float32')
+    return df
+
+
+def memory_report(file_path, sheet_name):
+    """Compare the footprint of the full sheet with the compact frame.
+
+    Returns a frame with one row per column and the deep size in bytes
+    before (every column, default dtypes) and after compaction.
+    """
+    before = parse_workbook(file_path, sheet_name, columns=None).memory_usage(deep=True, index=False)
+    after = parse_workbook(file_path, sheet_name).memory_usage(deep=True, index=False)
+    report = pd.DataFrame({'before': before, 'after': after}).fillna(0).astype('int64')
+    report.loc['TOTAL'] = report.sum()
+    return report
+
+
+def _sidecar_stem(file_path, sheet_name):
+    # "<workbook name>-<key of the path and sheet>": the same for every version
+    # of one sheet, different for other sheets and same-named workbooks elsewhere
+    source = hashlib.sha256(f"{os.path.abspath(file_path)}|{sheet_name}".encode('utf-8')).hexdigest()[:8]
+    return f"{os.path.splitext(os.path.basename(file_path))[0]}-{source}"
+
+
+def sidecar_path(file_path, sheet_name, version=None):
+    version = version or dataset_version(file_path, sheet_name)
+    return os.path.join(CACHE_DIR, f"{_sidecar_stem(file_path, sheet_name)}-{version}.parquet")
+
+
+def load_data(file_path, sheet_name, version=None):
+    """Load the sheet, reusing the Parquet sidecar when it is up to date."""
+    path = sidecar_path(file_path, sheet_name, version)
+    if os.path.exists(path):
+        df = pd.read_parquet(path)
+        # Parquet gives integer-coded labels (e.g. Department) back as plain ints
+        for col in CATEGORY_COLUMNS:
+            if col in df.columns and df[col].dtype != 'category':
+                df[col] = df[col].astype('category')
+        return df
+
+    df = parse_workbook(file_path, sheet_name)
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # Write to a temp file first so a concurrent reader never sees half a file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    _remove_stale_sidecars(file_path, sheet_name, keep=path)
+    return df
+
+
+def _remove_stale_sidecars(file_path, sheet_name, keep, suffix='.parquet'):
+    # Older versions of this sheet only, never another workbook's or sheet's files
+    pattern = re.compile(re.escape(_sidecar_stem(file_path, sheet_name)) + r"-[0-9a-f]{16}" + re.escape(suffix))
+    for name in os.listdir(CACHE_DIR):
+        path = os.path.join(CACHE_DIR, name)
+        if pattern.fullmatch(name) and path != keep:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+if __name__ == '__main__':
+    import sys
+
+    if len(sys.argv) != 3:
+        sys.exit("usage: python data_loader.py <workbook.xlsx> <sheet name>")
+    print(memory_report(sys.argv[1], sys.argv[2]).to_string())
@@ -0,0 +1,171 @@
+"""Bitmap index for the sidebar filters.
+
+One boolean mask per distinct value of every filter column is built when the
+data loads. A filter state is then resolved by OR-ing the masks of the
+selected values within a column and AND-ing the columns together, which
+touches only precomputed arrays instead of scanning the frame. Bitmaps are
+bit-packed (eight rows per byte) so the OR/AND work is an eighth of a
+boolean-array scan.
+
+Every frame of a cube (see cube.py) carries the filter columns, so the index
+keeps one set of bitmaps per frame and a filter state resolves to one mask
+per frame. A cube kept in parts (``CubeParts``) has one index per part, so
+adding a part indexes only its own rows.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+FILTER_COLUMNS = ['Gender', 'Department', 'Unit', 'ResignationReason', 'AgeGroup', 'MaritalStatus']
+
+# Resolved masks kept per index
+MASK_CACHE_SIZE = 64
+
+
+class _FrameBitmaps:
+    def __init__(self, df, columns):
+        self.size = len(df)
+        self.bitmaps = {}
+        self.not_null = {}
+        for col in columns:
+            if col not in df.columns:
+                continue
+            values = df[col].astype('category')
+            codes = values.cat.codes.to_numpy()
+            self.bitmaps[col] = {}
+            for i, value in enumerate(values.cat.categories):
+                bitmap = codes == i
+                if bitmap.any():
+                    self.bitmaps[col][value] = _freeze(np.packbits(bitmap))
+            self.not_null[col] = _freeze(np.packbits(codes >= 0))
+
+    def resolve(self, key):
+        result = None
+        for col, selected in key:
+            if selected is None:
+                continue
+            bitmaps = self.bitmaps[col]
+            hits = [bitmaps[value] for value in selected if value in bitmaps]
+            if len(hits) == len(bitmaps):
+                column_mask = self.not_null[col]
+            elif hits:
+                column_mask = np.bitwise_or.reduce(hits)
+            else:
+                return _freeze(np.zeros(self.size, dtype=bool))
+            if result is None:
+                result = column_mask.copy()
+            else:
+                result &= column_mask
+        if result is None:
+            return _freeze(np.ones(self.size, dtype=bool))
+        return _freeze(np.unpackbits(result, count=self.size).view(bool))
+
+
+class FilterIndex:
+    def __init__(self, cube, columns=FILTER_COLUMNS):
+        self.frames = {name: _FrameBitmaps(frame, columns) for name, frame in cube.frames.items()}
+        # Every frame holds the same filter values; any one answers values()
+        self.bitmaps = next(iter(self.frames.values())).bitmaps
+        self._first_frame = next(iter(cube.frames.values()))
+        self._counts = {}
+        # Per instance, so an index dropped after a version change takes its masks with it
+        self._masks = OrderedDict()
+        self._lock = threading.Lock()
+
+    def values(self, column):
+        """Sorted distinct non-null values of a column, for the select widgets."""
+        return sorted(self.bitmaps.get(column, {}))
+
+    def mask(self, selections):
+        """Resolve a filter state to a read-only boolean row mask per cube frame.
+
+        ``selections`` maps a column to the values to keep; ``None`` means the
+        column is not filtered. An empty selection matches no rows, like
+        ``Series.isin([])``.
+        """
+        key = tuple((col, selected) for col, selected in normalize(selections) if col in self.bitmaps)
+        with self._lock:
+            if key in self._masks:
+                self._masks.move_to_end(key)
+                return self._masks[key]
+        masks = {name: frame.resolve(key) for name, frame in self.frames.items()}
+        with self._lock:
+            self._masks[key] = masks
+            while len(self._masks) > MASK_CACHE_SIZE:
+                self._masks.popitem(last=False)
+        return masks
+
+    def cache_clear(self):
+        with self._lock:
+            self._masks.clear()
+
+    def counts(self, column):
+        """Summed Count per value of a column; negative in a part of replaced rows."""
+        if column not in self.bitmaps:
+            return pd.Series(dtype='int64')
+        if column not in self._counts:
+            self._counts[column] = self._first_frame.groupby(column, observed=True)['Count'].sum()
+        return self._counts[column]
+
+
+class PartsFilterIndex:
+    """One ``FilterIndex`` per part of a ``CubeParts``.
+
+    A filter state resolves to the list of every part's masks. A value is
+    offered while its rows, summed over the parts, have not all been
+    replaced.
+    """
+
+    def __init__(self, indexes):
+        self.indexes = indexes
+        self._values = {}
+
+    def values(self, column):
+        if column not in self._values:
+            counts = pd.concat([index.counts(column) for index in self.indexes]).groupby(level=0).sum()
+            self._values[column] = sorted(counts.index[counts > 0])
+        return list(self._values[column])
+
+    def mask(self, selections):
+        return [index.mask(selections) for index in self.indexes]
+
+    def cache_clear(self):
+        for index in self.indexes:
+            index.cache_clear()
+
+
+def default_selections(source):
+    """The sidebar's initial state: every selectbox on "all", every multiselect full.
+
+    ``source`` is a filter index or a SQL store; anything with ``values(column)`` will do.
+    """
+    return {
+        'Gender': None,
+        'Department': None,
+        'Unit': None,
+        'ResignationReason': source.values('ResignationReason'),
+        'AgeGroup': source.values('AgeGroup'),
+        'MaritalStatus': source.values('MaritalStatus'),
+    }
+
+
+def normalize(selections):
+    """Hashable, order-independent form of a filter state.
+
+    Columns are sorted by name and each selection becomes a sorted tuple of
+    distinct values (``None`` when the column is not filtered), so equal
+    filter states give equal keys whatever order the values were picked in
+    and however often they repeat.
+    """
+    return tuple(sorted(
+        (col, None if selected is None else tuple(sorted(set(selected), key=str)))
+        for col, selected in selections.items()
+    ))
+
+
+def _freeze(array):
+    # Masks are shared between sessions, so make accidental writes fail loudly
+    array.flags.writeable = False
+    return array
@@ -0,0 +1,118 @@
+"""Monthly headcount and turnover-rate engine.
+
+Every employee is an interval ``[DateOfStart, DateOfLeaving)`` at month
+resolution. Hires and leavers are scattered onto a (group, month) grid and
+a single cumulative sweep along the month axis turns them into opening and
+closing headcount, so the cost is linear in the number of intervals plus
+the size of the grid. The rows of the interval cube are fed in as they are,
+as weighted intervals; the scatter sums them, so no roll-up is needed.
+"""
+import numpy as np
+import pandas as pd
+
+from cube import interval_rows
+
+HEADCOUNT_COLUMNS = ['Opening', 'Hires', 'Leavers', 'Closing']
+
+
+def _month_numbers(months):
+    # Months since 1970-01; NaT becomes -1
+    values = np.asarray(months, dtype='datetime64[ns]').astype('datetime64[M]')
+    numbers = values.astype('int64')
+    numbers[np.isnat(values)] = -1
+    return numbers
+
+
+def sweep(groups, starts, leaves, weights, n_groups):
+    """Per-group monthly headcount from weighted intervals.
+
+    ``groups`` are group codes in ``range(n_groups)``; ``starts`` and
+    ``leaves`` are month numbers (-1 when missing). An interval without a
+    start is taken to be open before the first month of the window. Returns
+    the first month number and four ``(n_groups, n_months)`` arrays: opening
+    headcount, hires, leavers and closing headcount.
+    """
+    known = np.concatenate([starts[starts >= 0], leaves[leaves >= 0]])
+    if not len(known):
+        empty = np.zeros((n_groups, 0))
+        return 0, empty, empty, empty, empty
+    first, last = known.min(), known.max()
+    n_months = int(last - first + 1)
+
+    def scatter(months, mask):
+        flat = groups[mask] * n_months + (months[mask] - first)
+        return np.bincount(flat, weights=weights[mask], minlength=n_groups * n_months).reshape(n_groups, n_months)
+
+    hires = scatter(starts, starts >= 0)
+    leavers = scatter(leaves, leaves >= 0)
+    # Intervals with an unknown start are already on the books in the first month
+    carried = np.bincount(groups[starts < 0], weights=weights[starts < 0], minlength=n_groups)
+
+    closing = carried[:, None] + np.cumsum(hires - leavers, axis=1)
+    opening = closing - hires + leavers
+    return first, opening, hires, leavers, closing
+
+
+def headcount_table(view, by=('Department', 'Unit')):
+    """Monthly Opening/Hires/Leavers/Closing and TurnoverRate per ``by`` group."""
+    by = list(by)
+    intervals = interval_rows(view, by + ['StartMonth', 'LeavingMonth'])
+    intervals = intervals[intervals['Count'] > 0].reset_index(drop=True)
+    if intervals.empty:
+        return pd.DataFrame(columns=by + ['YearMonth'] + HEADCOUNT_COLUMNS + ['TurnoverRate'])
+
+    grouped = intervals.groupby(by, observed=True, dropna=False, sort=True)
+    groups = grouped.ngroup().to_numpy()
+    labels = grouped.size().index
+    first, opening, hires, leavers, closing = sweep(
+        groups,
+        _month_numbers(intervals['StartMonth']),
+        _month_numbers(intervals['LeavingMonth']),
+        intervals['Count'].to_numpy(dtype='float64'),
+        len(labels),
+    )
+
+    n_groups, n_months = opening.shape
+    months = pd.to_datetime((first + np.arange(n_months)).astype('datetime64[M]'))
+    table = pd.DataFrame({
+        'YearMonth': np.tile(months, n_groups),
+        'Opening': opening.ravel(),
+        'Hires': hires.ravel(),
+        'Leavers': leavers.ravel(),
+        'Closing': closing.ravel(),
+    })
+    group_frame = labels.to_frame(index=False) if isinstance(labels, pd.MultiIndex) else pd.DataFrame({by[0]: labels})
+    table = pd.concat([group_frame.loc[group_frame.index.repeat(n_months)].reset_index(drop=True), table], axis=1)
+    return with_turnover_rate(table)
+
+
+def with_turnover_rate(table):
+    """Monthly turnover: leavers over the average of opening and closing headcount."""
+    average = (table['Opening'] + table['Closing']) / 2
+    table['TurnoverRate'] = (table['Leavers'] / average.where(average > 0) * 100)
+    return table
+
+
+def monthly_totals(table, by=()):
+    """Collapse a headcount table to ``by`` (all groups when empty) per month."""
+    keys = list(by) + ['YearMonth']
+    totals = table.groupby(keys, observed=True, sort=True)[HEADCOUNT_COLUMNS].sum().reset_index()
+    return with_turnover_rate(totals)
+
+
+def period_turnover(table, by='Department'):
+    """Annualized turnover per ``by``: leavers per year over average headcount.
+
+    Every leaver counts, including one hired and gone within the same month.
+    Only months in which the group had staff count towards the average and
+    the length of the period, so groups that open late are not diluted. A
+    group that never had staff at a month boundary has no rate (NaN).
+    """
+    monthly = monthly_totals(table, [by])
+    monthly['Average'] = (monthly['Opening'] + monthly['Closing']) / 2
+    leavers = monthly.groupby(by, observed=True, sort=True)['Leavers'].sum()
+    active = monthly[monthly['Average'] > 0]
+    period = active.groupby(by, observed=True, sort=True).agg(
+        Average=('Average', 'mean'), Months=('Average', 'size')).reindex(leavers.index)
+    period['TurnoverRate'] = leavers * 12 / period['Months'] / period['Average'] * 100
+    return period['TurnoverRate'].reset_index()
@@ -0,0 +1,249 @@
+"""Incremental ingestion of a directory of monthly workbooks.
+
+HR drops one export per month into a directory. Each new or changed
+workbook is streamed in row chunks and only the records not seen before
+(or seen with different contents) are appended to the dataset as a Parquet
+part under ``CACHE_DIR``. A manifest remembers every file by size,
+modification time and content hash, and the parts remember every record
+key, so a refresh parses only the new month. Its cube (the new rows, minus
+the rows they replace) and a filter index over it are kept as one more
+part of a ``CubeParts``. The history is not regrouped until the next
+start, which aggregates all the parts into one.
+
+Every row is one resignation, so a record is keyed by its EmployeeID and
+DateOfStart: a later row with both replaces it (a correction), while a
+rehired employee's next resignation is a record of its own. Rows without a
+real ID (missing, or a placeholder such as the 0 the workbook uses), and
+repeats of a key already met earlier in the same file, are keyed by their
+contents instead. Removing a workbook from the directory does not remove
+its records.
+"""
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from cube import CubeParts, build_cube, merge_cubes, negate
+from data_loader import (
+    CACHE_DIR, CATEGORY_COLUMNS, COLUMNS, SCHEMA_VERSION, _content_hash, _sidecar_stem, compact_frame,
+    iter_workbook_chunks,
+)
+from filters import FilterIndex, PartsFilterIndex
+
+DATA_DIR = os.environ.get('HR_DATA_DIR')
+
+INGEST_COLUMNS = ['EmployeeID'] + COLUMNS
+WORKBOOK_SUFFIXES = ('.xlsx', '.xlsm')
+
+
+def record_keys(df, seen=None):
+    """Return ``(keys, hashes)``: the identity and content hash of every row.
+
+    ``seen`` carries what earlier chunks of the same file met (see
+    ``new_seen``) and is updated in place.
+    """
+    seen = new_seen() if seen is None else seen
+    contents = df[[col for col in INGEST_COLUMNS if col in df.columns]]
+    if 'EmployeeID' in df.columns:
+        contents = contents.assign(EmployeeID=_id_text(df['EmployeeID']))
+    hashes = pd.util.hash_pandas_object(contents, index=False).to_numpy()
+    if 'EmployeeID' in df.columns:
+        # Numeric IDs of 0 or less are placeholders, not employees
+        placeholder = pd.to_numeric(df['EmployeeID'], errors='coerce') <= 0
+        starts = df['DateOfStart'].dt.strftime('%Y-%m-%d').astype(object).fillna('') if 'DateOfStart' in df.columns else ''
+        events = contents['EmployeeID'] + '|' + starts
+        usable = (events.notna() & ~placeholder & ~events.duplicated() & ~events.isin(seen['keys'])).to_numpy()
+        seen['keys'].update(events[usable])
+    else:
+        events = pd.Series(None, index=df.index, dtype=object)
+        usable = np.zeros(len(df), dtype=bool)
+    # Identical anonymous rows in one file are told apart by their occurrence
+    by_content = []
+    for h in hashes[~usable]:
+        occurrence = seen['contents'].get(h, 0)
+        seen['contents'][h] = occurrence + 1
+        by_content.append(f"#{h:016x}:{occurrence}")
+    keys = np.empty(len(df), dtype=object)
+    keys[usable] = ('id:' + events[usable]).to_numpy()
+    keys[~usable] = by_content
+    return keys, hashes
+
+
+def _id_text(ids):
+    # A chunk with a blank ID is read as float, and 7.0 must match 7 elsewhere
+    if pd.api.types.is_float_dtype(ids) and (ids.dropna() % 1 == 0).all():
+        ids = ids.astype('Int64')
+    # Object even when every ID is blank, which map() would otherwise turn into float
+    return ids.astype(object).where(ids.notna()).map(str, na_action='ignore').astype(object)
+
+
+def new_seen():
+    """Empty ``record_keys`` state for one file: keys met and occurrences per anonymous row."""
+    return {'keys': set(), 'contents': {}}
+
+
+class IncrementalDataset:
+    def __init__(self, data_dir, sheet_name):
+        self.data_dir = data_dir
+        self.sheet_name = sheet_name
+        # One root per directory and sheet, like the sidecars, so same-named
+        # directories elsewhere and other sheets keep their records apart
+        self.root = os.path.join(CACHE_DIR, _sidecar_stem(os.path.abspath(data_dir), sheet_name) + '-ingest')
+        self.manifest_path = os.path.join(self.root, 'manifest.json')
+        self._lock = threading.Lock()
+
+        self.manifest = self._read_manifest()
+        self.parts = [self._read_part(name) for name in self.manifest['parts']]
+        # RecordKey -> (RowHash, part number) of the current version of each record
+        self.current = {}
+        for number, part in enumerate(self.parts):
+            self.current.update(zip(part['RecordKey'], zip(part['RowHash'], [number] * len(part))))
+        self._rebuild()
+
+    @property
+    def version(self):
+        raw = f"{os.path.abspath(self.data_dir)}|{self.sheet_name}|{'|'.join(self.manifest['parts'])}|{SCHEMA_VERSION}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:16]
+
+    def refresh(self):
+        """Ingest new or changed workbooks; return ``(version, cube, filter_index)``.
+
+        Unchanged files cost one ``stat`` each, so this is cheap to call on
+        every rerun.
+        """
+        with self._lock:
+            dirty = False
+            for name in sorted(os.listdir(self.data_dir)):
+                if not name.endswith(WORKBOOK_SUFFIXES) or name.startswith('~$'):
+                    continue
+                path = os.path.join(self.data_dir, name)
+                stat = os.stat(path)
+                entry = self.manifest['files'].get(name)
+                if entry and (entry['mtime_ns'], entry['size']) == (stat.st_mtime_ns, stat.st_size):
+                    continue
+                sha256 = _content_hash(path, stat.st_mtime_ns, stat.st_size)
+                if not entry or entry['sha256'] != sha256:
+                    new, replaced = self._ingest_file(path)
+                    entry = {'sha256': sha256, 'new': new, 'replaced': replaced}
+                self.manifest['files'][name] = dict(entry, mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+                dirty = True
+            if dirty:
+                self._write_manifest()
+            return self.version, self.cube, self.filter_index
+
+    def frame(self):
+        """The current version of every record."""
+        return self._latest_rows()
+
+    def _latest_rows(self):
+        if not self.parts:
+            return pd.DataFrame(columns=INGEST_COLUMNS)
+        kept = []
+        for number, part in enumerate(self.parts):
+            latest = np.fromiter((self.current[key][1] == number for key in part['RecordKey']), bool, len(part))
+            kept.append(part[latest])
+        return compact_frame(pd.concat(kept, ignore_index=True))
+
+    def _rebuild(self):
+        # Full recompute from the stored parts into a single cube part; no
+        # workbook is parsed
+        frame = self._latest_rows()
+        self._cube_parts, self._indexes = [], []
+        self.cube = self.filter_index = None
+        if len(frame):
+            self._add_cube_part(build_cube(frame))
+
+    def _add_cube_part(self, cube):
+        self._cube_parts.append(cube)
+        self._indexes.append(FilterIndex(cube))
+        # New objects, so a reader holding the previous pair keeps a consistent one
+        self.cube = CubeParts(list(self._cube_parts))
+        self.filter_index = PartsFilterIndex(list(self._indexes))
+
+    def _ingest_file(self, path):
+        # One chunk at a time: rows already known are dropped before the next
+        # chunk is read, and the cube takes the new and replaced rows as deltas
+        seen = new_seen()
+        fresh_rows, deltas, replaced = [], [], 0
+        for chunk in iter_workbook_chunks(path, self.sheet_name, columns=INGEST_COLUMNS):
+            keys, hashes = record_keys(chunk, seen)
+            known = [self.current.get(key) for key in keys]
+            fresh = np.array([entry is None or entry[0] != h for entry, h in zip(known, hashes)], dtype=bool)
+            if not fresh.any():
+                continue
+            rows = chunk[fresh].reset_index(drop=True)
+            rows['RecordKey'] = keys[fresh]
+            rows['RowHash'] = hashes[fresh]
+            fresh_rows.append(rows)
+            deltas.append(build_cube(rows))
+            old = self._current_rows([key for key, entry, new in zip(keys, known, fresh) if new and entry])
+            if len(old):
+                deltas.append(negate(build_cube(old)))
+                replaced += len(old)
+        if not fresh_rows:
+            return 0, 0
+
+        rows = compact_frame(pd.concat(fresh_rows, ignore_index=True))
+        name = f"part-{len(self.parts):05d}.parquet"
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = os.path.join(self.root, f"{name}.{os.getpid()}.tmp")
+        rows.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, os.path.join(self.root, name))
+        number = len(self.parts)
+        self.parts.append(rows)
+        self.manifest['parts'].append(name)
+        self.current.update(zip(rows['RecordKey'], zip(rows['RowHash'], [number] * len(rows))))
+        part = merge_cubes(deltas)
+        # Corrections outside the cube's columns net out to nothing
+        if any(part.sizes().values()):
+            self._add_cube_part(part)
+        return len(rows) - replaced, replaced
+
+    def _current_rows(self, keys):
+        # The rows that ``keys`` pointed at before this refresh
+        by_part = {}
+        for key in keys:
+            by_part.setdefault(self.current[key][1], []).append(key)
+        rows = [self.parts[number][self.parts[number]['RecordKey'].isin(part_keys)]
+                for number, part_keys in by_part.items()]
+        return compact_frame(pd.concat(rows, ignore_index=True)) if rows else pd.DataFrame()
+
+    def _read_manifest(self):
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('schema') == SCHEMA_VERSION:
+                return manifest
+        return {'schema': SCHEMA_VERSION, 'files': {}, 'parts': []}
+
+    def _write_manifest(self):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _read_part(self, name):
+        part = pd.read_parquet(os.path.join(self.root, name))
+        for col in CATEGORY_COLUMNS:
+            if col in part.columns and part[col].dtype != 'category':
+                part[col] = part[col].astype('category')
+        return part
+
+
+if __name__ == '__main__':
+    import sys
+    import time
+
+    if len(sys.argv) != 3:
+        sys.exit("usage: python ingest.py <workbook directory> <sheet name>")
+    started = time.perf_counter()
+    dataset = IncrementalDataset(sys.argv[1], sys.argv[2])
+    version, cube, _ = dataset.refresh()
+    for name, entry in dataset.manifest['files'].items():
+        print(f"{name}: {entry['new']} new, {entry['replaced']} replaced")
+    print(f"version {version}: {len(dataset.current)} records, "
+          f"{0 if cube is None else sum(cube.sizes().values())} cube rows, {time.perf_counter() - started:.2f}s")
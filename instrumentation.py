@@ -0,0 +1,171 @@
+"""Per-rerun timing of the dashboard's hot path.
+
+Set ``HR_INSTRUMENT=1`` to time every stage of a rerun (data load, filters,
+KPIs, each tab's build, Plotly serialization and rendering), or
+``HR_INSTRUMENT=memory`` to also trace the peak memory each stage allocates.
+Each finished rerun is written as one JSON line to a rotating log under
+``CACHE_DIR`` and added to a process-wide window of samples, from which
+p50/p95 per stage are computed.
+
+With instrumentation off, ``start_rerun`` hands out a shared no-op recorder,
+so a wrapped stage costs one attribute lookup and an empty ``with`` block.
+"""
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import defaultdict, deque
+from logging.handlers import RotatingFileHandler
+
+import numpy as np
+import pandas as pd
+
+from data_loader import CACHE_DIR
+
+MODE = os.environ.get('HR_INSTRUMENT', '').lower()
+ENABLED = MODE not in ('', '0', 'false', 'off')
+TRACE_MEMORY = MODE == 'memory'
+
+LOG_PATH = os.path.join(CACHE_DIR, 'timings.log')
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 3
+
+# The timing panel is shown only with ?admin=<HR_ADMIN_TOKEN> in the URL
+ADMIN_TOKEN = os.environ.get('HR_ADMIN_TOKEN')
+
+# Samples kept per stage for the percentiles
+WINDOW = 1000
+
+# Latest time.perf_counter() of each named point of the script, always kept
+startup_marks = {}
+
+_samples = defaultdict(lambda: deque(maxlen=WINDOW))
+_samples_lock = threading.Lock()
+_logger = None
+
+
+class _Stage:
+    def __init__(self, rerun, name, record):
+        self.rerun = rerun
+        self.name = name
+        self.record = record
+
+    def __enter__(self):
+        if TRACE_MEMORY:
+            # Peak above what was held on entry, as benchmark.py reports it; a
+            # stage that frees more than it allocates would give a negative net
+            tracemalloc.reset_peak()
+            self._baseline = tracemalloc.get_traced_memory()[0]
+        self._started = time.perf_counter()
+        return self.record
+
+    def __exit__(self, *exc):
+        self.record['seconds'] = time.perf_counter() - self._started
+        if TRACE_MEMORY:
+            self.record['peak_bytes'] = tracemalloc.get_traced_memory()[1] - self._baseline
+        self.rerun.stages.append(dict(self.record, stage=self.name))
+        return False
+
+
+class Rerun:
+    """Stage records of one script run."""
+
+    enabled = True
+
+    def __init__(self):
+        self.started = time.time()
+        self.stages = []
+
+    def stage(self, name, **fields):
+        """Time a ``with`` block; the yielded dict takes extra fields (rows, payload_bytes, ...)."""
+        return _Stage(self, name, fields)
+
+    def finish(self, **context):
+        """Log the rerun and add its stages to the percentile window."""
+        with _samples_lock:
+            for record in self.stages:
+                _samples[record['stage']].append(record['seconds'])
+        _log().info(json.dumps(dict(context, ts=self.started, stages=self.stages), ensure_ascii=False, default=str))
+
+    def frame(self):
+        return pd.DataFrame(self.stages, columns=['stage', 'seconds', 'rows', 'payload_bytes', 'peak_bytes'])
+
+
+class _NullStage:
+    def __enter__(self):
+        return {}
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _NullRerun:
+    enabled = False
+    stages = ()
+    _stage = _NullStage()
+
+    def stage(self, name, **fields):
+        return self._stage
+
+    def finish(self, **context):
+        pass
+
+
+_NULL_RERUN = _NullRerun()
+
+
+def mark(name):
+    """Note when the script reached ``name`` (e.g. first paint); costs one clock read."""
+    startup_marks[name] = time.perf_counter()
+
+
+def start_rerun():
+    if not ENABLED:
+        return _NULL_RERUN
+    if TRACE_MEMORY and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    return Rerun()
+
+
+def is_admin(query_params):
+    return bool(ENABLED and ADMIN_TOKEN) and query_params.get('admin') == ADMIN_TOKEN
+
+
+def percentiles():
+    """p50/p95 seconds and sample count per stage over the recent window."""
+    with _samples_lock:
+        samples = {stage: np.array(values) for stage, values in _samples.items()}
+    return pd.DataFrame(
+        [(stage, np.percentile(values, 50), np.percentile(values, 95), len(values))
+         for stage, values in sorted(samples.items())],
+        columns=['stage', 'p50', 'p95', 'samples'],
+    ).set_index('stage')
+
+
+def _log():
+    global _logger
+    if _logger is None:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        logger = logging.getLogger('hr_dashboard.timings')
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        if not logger.handlers:
+            handler = RotatingFileHandler(LOG_PATH, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger.addHandler(handler)
+        _logger = logger
+    return _logger
+
+
+if __name__ == '__main__':
+    import sys
+
+    # Percentiles over a timings log, e.g. one copied from a server
+    path = sys.argv[1] if len(sys.argv) > 1 else LOG_PATH
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            for record in json.loads(line)['stages']:
+                _samples[record['stage']].append(record['seconds'])
+    print(percentiles().to_string())
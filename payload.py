@@ -0,0 +1,82 @@
+"""Payload-size report for the dashboard tabs.
+
+Measures what each tab sends to the browser: serialized bytes, the number
+of data points in its figures and how many employee rows they summarize.
+When the raw rows are given, the report also measures the figures that used
+to embed every row (the reasons pie and the two WorkDuration histograms) so
+the reduction is visible.
+"""
+import pandas as pd
+import plotly.express as px
+
+from charts import TAB_TITLES, build_tab
+from cube import totals
+from view_cache import serialize_blocks
+
+TRACE_ARRAYS = ('x', 'y', 'values', 'labels', 'text')
+
+
+def payload_bytes(blocks):
+    """Bytes a list of serialized blocks puts on the wire."""
+    total = 0
+    for kind, payload in blocks:
+        if kind == "plotly":
+            total += len(payload.encode('utf-8'))
+        elif kind == "image":
+            total += len(payload)
+        elif kind == "table":
+            total += len(payload[0].to_json(orient='split').encode('utf-8'))
+        else:
+            total += len(str(payload).encode('utf-8'))
+    return total
+
+
+def data_points(fig):
+    points = 0
+    for trace in fig.data:
+        for name in TRACE_ARRAYS:
+            values = getattr(trace, name, None)
+            if values is not None and not isinstance(values, str):
+                points += len(values)
+    return points
+
+
+def _legacy_bytes(rows):
+    # The row-level figures the dashboard built before the cube
+    figures = {
+        0: [px.pie(rows, names="ResignationReason", hole=0.45)],
+        3: [px.histogram(rows, x='WorkDuration', nbins=20)],
+        11: [px.histogram(rows, x="WorkDuration", nbins=20)],
+    }
+    return {index: sum(len(fig.to_json().encode('utf-8')) for fig in figs) for index, figs in figures.items()}
+
+
+def payload_report(view, rows=None):
+    """One row per tab with its payload size and what it summarizes."""
+    legacy = _legacy_bytes(rows) if rows is not None else {}
+    records = []
+    for index, title in enumerate(TAB_TITLES):
+        blocks = build_tab(index, view)
+        figures = [payload for kind, payload in blocks if kind == "plotly"]
+        records.append({
+            'tab': index,
+            'title': title,
+            'figures': len(figures),
+            'points': sum(data_points(fig) for fig in figures),
+            'rows': int(totals(view)['Count']),
+            'bytes': payload_bytes(serialize_blocks(blocks)),
+            'legacy_bytes': legacy.get(index),
+        })
+    return pd.DataFrame(records).set_index('tab')
+
+
+if __name__ == '__main__':
+    import sys
+
+    from cube import build_cube
+    from data_loader import load_data
+
+    if len(sys.argv) != 3:
+        sys.exit("usage: python payload.py <workbook.xlsx> <sheet name>")
+    rows = load_data(sys.argv[1], sys.argv[2])
+    print(payload_report(build_cube(rows), rows).to_string())
@@ -0,0 +1,158 @@
+"""Headless batch report: every tab for every Department and every Unit.
+
+Builds the same tabs as the dashboard from the cached dataset, without a
+Streamlit server, and writes one static HTML page per filter state plus an
+index page. Filter states are spread over a process pool; each worker
+loads the Parquet sidecar and builds the cube once, then only filters and
+renders.
+
+    python report.py "Simple HR Data.xlsx" "الدوران + معدل البقاء" --out report
+
+Pass ``--png`` to also export every figure as PNG (needs ``kaleido``).
+"""
+import argparse
+import html
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from charts import TAB_TITLES, build_tab
+from cube import build_cube, totals
+from data_loader import load_data
+from filters import FilterIndex, default_selections
+
+PLOTLY_JS = 'plotly.min.js'
+
+NO_DATA = "لا توجد بيانات لهذا الاختيار."
+
+PAGE = """<!DOCTYPE html>
+<html lang="ar" dir="rtl">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+{head}
+<style>
+body {{ font-family: sans-serif; margin: 2rem auto; max-width: 1200px; color: #0d1b2a; }}
+section {{ margin-bottom: 3rem; }}
+.info, .warning {{ padding: .75rem 1rem; border-radius: 8px; background: #e0e1dd; }}
+img {{ max-width: 100%; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+{body}
+</body>
+</html>
+"""
+
+# Set in each worker by _init_worker
+_cube = None
+_filter_index = None
+
+
+def filter_states(filter_index):
+    """``(slug, label, selections)`` for the whole dataset, each Department and each Unit.
+
+    Every state starts from the dashboard's initial sidebar, so a page shows
+    what picking that Department or Unit in the dashboard would show.
+    """
+    defaults = default_selections(filter_index)
+    states = [('all', 'الكل', defaults)]
+    for column, name, prefix in (('Department', 'القسم', 'department'), ('Unit', 'الإدارة', 'unit')):
+        for i, value in enumerate(filter_index.values(column)):
+            states.append((f"{prefix}-{i:03d}", f"{name}: {value}", dict(defaults, **{column: [value]})))
+    return states
+
+
+def render_block(kind, payload, stem, png):
+    if kind == "plotly":
+        if png:
+            payload.write_image(f"{stem}.png")
+        return payload.to_html(full_html=False, include_plotlyjs=False)
+    if kind == "image":
+        with open(f"{stem}.png", 'wb') as f:
+            f.write(payload)
+        return f'<img src="{os.path.basename(stem)}.png" alt="">'
+    if kind == "table":
+        frame, formats = payload
+        return frame.style.format(formats).to_html()
+    if kind == "markdown":
+        level = len(payload) - len(payload.lstrip('#'))
+        if level:
+            return f"<h{level}>{html.escape(payload[level:].strip())}</h{level}>"
+        return f"<p>{html.escape(payload)}</p>"
+    return f'<p class="{kind}">{html.escape(str(payload))}</p>'
+
+
+def _init_worker(file_path, sheet_name):
+    global _cube, _filter_index
+    _cube = build_cube(load_data(file_path, sheet_name))
+    _filter_index = FilterIndex(_cube)
+
+
+def render_state(out_dir, slug, label, selections, png=False):
+    """Write ``<out_dir>/<slug>/index.html``; return the number of employees in the view."""
+    view = _cube[_filter_index.mask(selections)]
+    rows = int(totals(view)['Count'])
+    page_dir = os.path.join(out_dir, slug)
+    os.makedirs(page_dir, exist_ok=True)
+
+    # A Department or Unit whose rows all fall outside the default filters,
+    # or an empty sheet, gets a note instead of twelve empty tabs
+    if not rows:
+        sections = [render_block("info", NO_DATA, None, png)]
+    else:
+        sections = []
+        for index, title in enumerate(TAB_TITLES):
+            parts = [render_block(kind, payload, os.path.join(page_dir, f"tab{index:02d}-{n}"), png)
+                     for n, (kind, payload) in enumerate(build_tab(index, view))]
+            sections.append(f"<section><h2>{html.escape(title)}</h2>{''.join(parts)}</section>")
+
+    head = f'<script src="../{PLOTLY_JS}"></script>'
+    with open(os.path.join(page_dir, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(PAGE.format(title=html.escape(label), head=head, body='\n'.join(sections)))
+    return rows
+
+
+def build_report(file_path, sheet_name, out_dir, workers=None, png=False):
+    """Render every filter state in parallel; return the ``(slug, label, rows)`` list."""
+    from plotly.offline import get_plotlyjs
+
+    # Parse (or refresh the sidecar) once here so the workers only read Parquet
+    states = filter_states(FilterIndex(build_cube(load_data(file_path, sheet_name))))
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, PLOTLY_JS), 'w', encoding='utf-8') as f:
+        f.write(get_plotlyjs())
+
+    results = {}
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(file_path, sheet_name)) as pool:
+        futures = {pool.submit(render_state, out_dir, slug, label, selections, png): (slug, label)
+                   for slug, label, selections in states}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+
+    pages = [(slug, label, results[(slug, label)]) for slug, label, _ in states]
+    links = '\n'.join(
+        f'<li><a href="{slug}/index.html">{html.escape(label)}</a>'
+        + ('' if rows else f' ({NO_DATA})') + '</li>'
+        for slug, label, rows in pages
+    )
+    with open(os.path.join(out_dir, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(PAGE.format(title="تقرير استقالات الموظفين", head='', body=f"<ul>{links}</ul>"))
+    return pages
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Render every tab for every Department and Unit to static HTML.")
+    parser.add_argument('file_path')
+    parser.add_argument('sheet_name')
+    parser.add_argument('--out', default='report')
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: one per core)")
+    parser.add_argument('--png', action='store_true', help="also export figures as PNG (needs kaleido)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    pages = build_report(args.file_path, args.sheet_name, args.out, args.workers, args.png)
+    empty = sum(not rows for _, _, rows in pages)
+    print(f"{len(pages)} pages, {empty} without data, {time.perf_counter() - started:.1f}s -> "
+          f"{os.path.join(args.out, 'index.html')}")
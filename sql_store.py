@@ -0,0 +1,217 @@
+"""Optional SQL backend for the dashboard.
+
+Set ``HR_BACKEND=sqlite`` or ``HR_BACKEND=duckdb`` to keep the employee rows
+in an embedded database under ``CACHE_DIR`` instead of an in-memory cube.
+The workbook is streamed into the table chunk by chunk, the sidebar filters
+become a WHERE clause and every roll-up a GROUP BY, so only the aggregated
+rows ever reach pandas. SQLite ships with Python; DuckDB is imported only
+when it is selected.
+
+A store view answers ``rollup`` and ``totals`` with the same measures, index
+and dtypes as the cube, so the tab builders work unchanged on either path.
+"""
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+from cube import CUBE_DIMENSIONS, MEASURES
+from data_loader import (
+    CACHE_DIR, CATEGORY_COLUMNS, DATE_COLUMNS, _remove_stale_sidecars, _sidecar_stem, dataset_version,
+    iter_workbook_chunks, month_map,
+)
+from filters import FILTER_COLUMNS
+
+BACKEND = os.environ.get('HR_BACKEND', 'pandas')
+BACKENDS = ('sqlite', 'duckdb')
+
+TABLE = 'employees'
+INDEXED_COLUMNS = ['Department', 'Unit', 'Gender', 'DateOfStart', 'DateOfLeaving', 'StartMonth', 'LeavingMonth']
+MONTH_COLUMNS = ['StartMonth', 'LeavingMonth']
+BUCKET_COLUMNS = ['TenureBucketStart', 'TenureBucketEnd']
+
+# Every measure of the cube as an aggregate over the employee rows
+MEASURE_SQL = ', '.join([
+    'COUNT(*) AS "Count"',
+    'COALESCE(SUM("WorkDuration"), 0) AS "WorkDurationSum"',
+    'COUNT("WorkDuration") AS "WorkDurationCount"',
+    'COUNT("DateOfStart") AS "Hires"',
+    'COUNT("DateOfLeaving") AS "Leavers"',
+])
+
+# (integer, float, timestamp, text)
+DIALECTS = {
+    'sqlite': ('INTEGER', 'REAL', 'TEXT', 'TEXT'),
+    'duckdb': ('BIGINT', 'DOUBLE', 'TIMESTAMP', 'VARCHAR'),
+}
+
+
+def _quote(name):
+    return f'"{name}"'
+
+
+def _connect(backend, path):
+    if backend == 'duckdb':
+        import duckdb
+        return duckdb.connect(path)
+    if backend == 'sqlite':
+        return sqlite3.connect(path, check_same_thread=False)
+    raise ValueError(f"unknown backend {backend!r}; expected one of {BACKENDS}")
+
+
+def _sql_type(dtype, backend):
+    integer, real, timestamp, text = DIALECTS[backend]
+    if isinstance(dtype, pd.CategoricalDtype):
+        dtype = dtype.categories.dtype
+    if pd.api.types.is_integer_dtype(dtype):
+        return integer
+    if pd.api.types.is_float_dtype(dtype):
+        return real
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return timestamp
+    return text
+
+
+def _plain(series, backend):
+    # Python values with None for missing, as sqlite3 expects
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        series = series.dt.strftime('%Y-%m-%d %H:%M:%S')
+    values = series.astype(object)
+    return [None if pd.isna(value) else value.item() if hasattr(value, 'item') else value
+            for value in values.where(series.notna(), None)]
+
+
+def store_path(file_path, sheet_name, backend, version=None):
+    version = version or dataset_version(file_path, sheet_name)
+    return os.path.join(CACHE_DIR, f"{_sidecar_stem(file_path, sheet_name)}-{version}.{backend}")
+
+
+def open_store(file_path, sheet_name, backend=None, version=None):
+    """Open the store for this workbook version, building it if needed."""
+    backend = backend or BACKEND
+    version = version or dataset_version(file_path, sheet_name)
+    path = store_path(file_path, sheet_name, backend, version)
+    if not os.path.exists(path):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # Build next to the final file and swap it in, like the Parquet sidecar
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        connection = _connect(backend, tmp_path)
+        try:
+            _ingest(connection, backend, iter_workbook_chunks(file_path, sheet_name))
+        finally:
+            connection.close()
+        os.replace(tmp_path, path)
+        _remove_stale_sidecars(file_path, sheet_name, keep=path, suffix=f".{backend}")
+    return Store(_connect(backend, path), backend)
+
+
+def _ingest(connection, backend, chunks):
+    columns = None
+    for chunk in chunks:
+        if columns is None:
+            columns = list(chunk.columns)
+            definitions = ', '.join(f"{_quote(col)} {_sql_type(chunk[col].dtype, backend)}" for col in columns)
+            connection.execute(f"CREATE TABLE {TABLE} ({definitions})")
+        if backend == 'duckdb':
+            # DuckDB scans a registered frame directly, far faster than executemany
+            plain = chunk[columns].astype({col: object for col in columns if chunk[col].dtype == 'category'})
+            connection.register('chunk', plain)
+            connection.execute(f"INSERT INTO {TABLE} SELECT * FROM chunk")
+            connection.unregister('chunk')
+        else:
+            placeholders = ', '.join('?' for _ in columns)
+            rows = list(zip(*(_plain(chunk[col], backend) for col in columns)))
+            connection.executemany(f"INSERT INTO {TABLE} VALUES ({placeholders})", rows)
+    if columns is None:
+        raise ValueError("the sheet has no data rows")
+
+    for col in INDEXED_COLUMNS:
+        if col in columns:
+            connection.execute(f"CREATE INDEX idx_{col} ON {TABLE} ({_quote(col)})")
+    connection.commit()
+
+
+class Store:
+    def __init__(self, connection, backend):
+        self.connection = connection
+        self.backend = backend
+        self._lock = threading.Lock()
+        names = [row[0] for row in self.query(f"SELECT * FROM {TABLE} LIMIT 0")[1]]
+        self.columns = [col for col in CUBE_DIMENSIONS if col in names]
+        # A store holds one workbook version, so the sidebar's options are
+        # read once here instead of by a DISTINCT scan on every rerun
+        self._values = {col: self._distinct(col) for col in FILTER_COLUMNS if col in self.columns}
+
+    def query(self, sql, params=()):
+        """Run ``sql`` and return ``(rows, description)``."""
+        with self._lock:
+            cursor = self.connection.execute(sql, list(params))
+            return cursor.fetchall(), cursor.description
+
+    def values(self, column):
+        """Sorted distinct non-null values of a column, for the select widgets."""
+        if column in self._values:
+            return list(self._values[column])
+        if column not in self.columns:
+            return []
+        return self._distinct(column)
+
+    def _distinct(self, column):
+        rows, _ = self.query(f"SELECT DISTINCT {_quote(column)} FROM {TABLE} WHERE {_quote(column)} IS NOT NULL")
+        return sorted(row[0] for row in rows)
+
+    def view(self, selections):
+        return StoreView(self, selections)
+
+
+class StoreView:
+    """A filter state over a store, with the cube's roll-up interface."""
+
+    def __init__(self, store, selections):
+        self.store = store
+        self.columns = store.columns
+        self.where, self.params = _where(selections, store.columns)
+
+    def rollup(self, by, dropna=False):
+        keys = ', '.join(_quote(col) for col in by)
+        rows, description = self.store.query(
+            f"SELECT {keys}, {MEASURE_SQL} FROM {TABLE}{self.where} GROUP BY {keys}", self.params)
+        frame = _typed(pd.DataFrame.from_records(rows, columns=[d[0] for d in description]), by)
+        return frame.groupby(by, observed=True, dropna=dropna, sort=True)[MEASURES].sum()
+
+    def totals(self):
+        rows, description = self.store.query(f"SELECT {MEASURE_SQL} FROM {TABLE}{self.where}", self.params)
+        return pd.Series(rows[0], index=[d[0] for d in description])[MEASURES]
+
+
+def _where(selections, columns):
+    clauses, params = [], []
+    for col, selected in selections.items():
+        if selected is None or col not in columns:
+            continue
+        if not len(selected):
+            # An empty selection matches no rows, like Series.isin([])
+            clauses.append("1 = 0")
+            continue
+        clauses.append(f"{_quote(col)} IN ({', '.join('?' for _ in selected)})")
+        params.extend(value.item() if hasattr(value, 'item') else value for value in selected)
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+def _typed(frame, by):
+    # Give the keys the dtypes the cube has, so sorting and labels match it
+    for col in by:
+        if col in MONTH_COLUMNS or col in DATE_COLUMNS:
+            frame[col] = pd.to_datetime(frame[col]).astype('datetime64[ns]')
+        elif col in BUCKET_COLUMNS:
+            frame[col] = frame[col].astype('float32')
+        elif col == 'BirthMonthName':
+            frame[col] = pd.Categorical(frame[col], categories=[month_map[i] for i in range(1, 13)], ordered=True)
+        elif col in CATEGORY_COLUMNS:
+            frame[col] = frame[col].astype('category')
+    for col in MEASURES:
+        frame[col] = frame[col].astype('float64' if col == 'WorkDurationSum' else 'int32')
+    return frame
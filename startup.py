@@ -0,0 +1,195 @@
+"""Cached data sources for the dashboard, and a pre-warmed launcher.
+
+The loaders are shared by every session through ``st.cache_resource``. They
+live here rather than in main.py so they can also run in the server process
+before Streamlit starts listening:
+
+    python startup.py serve [streamlit options]
+
+loads the dataset, builds the filter index and every tab of the default
+all-filters view, and only then starts ``streamlit run main.py`` in the same
+process, so the first visitor hits warm caches.
+
+    python startup.py measure
+
+reports time to first paint and time to interactive for a cold start (no
+sidecar), a restart (sidecar on disk), a pre-warmed start and a warm session.
+"""
+import os
+import time
+
+import streamlit as st
+
+from cube import build_cube
+from data_loader import dataset_version, load_data
+from filters import FilterIndex, default_selections, normalize
+from ingest import DATA_DIR, IncrementalDataset
+from sql_store import BACKEND, open_store
+from view_cache import ViewCache, serialize_blocks
+
+FILE_PATH = "Simple HR Data.xlsx"
+SHEET_NAME = "الدوران + معدل البقاء"
+
+DEFAULT_TURNOVER_THRESHOLD = 20
+
+
+# Every filter and chart is answered from this cube instead of the raw rows, so
+# the rows are not cached: they are freed once the cube is built, and a restart
+# reads them back from the Parquet sidecar. cache_resource hands every session
+# the same cube, so it must never be mutated.
+@st.cache_resource(show_spinner=False)
+def get_cube(file_path, sheet_name, version):
+    return build_cube(load_data(file_path, sheet_name, version))
+
+
+@st.cache_resource(show_spinner=False)
+def get_filter_index(file_path, sheet_name, version):
+    return FilterIndex(get_cube(file_path, sheet_name, version))
+
+
+# With HR_BACKEND=sqlite/duckdb the rows stay in an embedded database and the
+# filters and roll-ups run there instead of on the cube
+@st.cache_resource(show_spinner=False)
+def get_store(file_path, sheet_name, backend, version):
+    return open_store(file_path, sheet_name, backend, version)
+
+
+# With HR_DATA_DIR set, every workbook in that directory is ingested and new
+# monthly exports are appended on the next rerun without a full reload. The
+# dataset keeps its own filter index, extended part by part.
+@st.cache_resource(show_spinner=False)
+def get_incremental_dataset(data_dir, sheet_name):
+    return IncrementalDataset(data_dir, sheet_name)
+
+
+# Built tabs are shared by every session in the process, so a view built for
+# one user is free for the next
+@st.cache_resource(show_spinner=False)
+def get_view_cache():
+    return ViewCache()
+
+
+@st.cache_data(show_spinner=False)
+def read_styles(path, mtime_ns):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def open_source(file_path, sheet_name):
+    """Return ``(version, cube, source)`` for the configured backend.
+
+    ``source`` answers ``values(column)``; with a cube it is the filter index,
+    otherwise the SQL store. ``source`` is None when HR_DATA_DIR holds no
+    workbook yet.
+    """
+    if DATA_DIR:
+        return get_incremental_dataset(DATA_DIR, sheet_name).refresh()
+    version = dataset_version(file_path, sheet_name)
+    if BACKEND == 'pandas':
+        return version, get_cube(file_path, sheet_name, version), get_filter_index(file_path, sheet_name, version)
+    return version, None, get_store(file_path, sheet_name, BACKEND, version)
+
+
+def filtered_view(cube, source, selections):
+    return cube[source.mask(selections)] if cube is not None else source.view(selections)
+
+
+def view_key(version, selections):
+    return (version, BACKEND, normalize(selections))
+
+
+def prewarm(file_path=FILE_PATH, sheet_name=SHEET_NAME):
+    """Load the data and build every tab of the default view into the shared cache."""
+    from charts import TAB_TITLES, build_tab, department_turnover
+    from word_cloud import warm_reason_tokens
+
+    version, cube, source = open_source(file_path, sheet_name)
+    if source is None:
+        return version
+    warm_reason_tokens(source.values('ResignationReason'))
+    selections = default_selections(source)
+    view = filtered_view(cube, source, selections)
+    key = view_key(version, selections)
+    view_cache = get_view_cache()
+    view_cache.get_or_build(key + ('turnover_rates',), lambda: department_turnover(view)['TurnoverRate'])
+    for index in range(len(TAB_TITLES)):
+        options = {'turnover_threshold': DEFAULT_TURNOVER_THRESHOLD} if index == 10 else {}
+        view_cache.get_or_build(key + (index, tuple(sorted(options.items()))),
+                                lambda: serialize_blocks(build_tab(index, view, **options)))
+    return version
+
+
+def _run_scenario(scenario, spawned_at):
+    # One start in this fresh process; prints "<first paint> <interactive>"
+    from streamlit.testing.v1 import AppTest
+
+    import instrumentation
+
+    origin = spawned_at
+    if scenario == 'prewarmed':
+        prewarm()
+        origin = time.time()
+    AppTest.from_file(os.path.abspath('main.py'), default_timeout=600).run()
+    if scenario == 'warm':
+        # A second visitor in the same server process
+        origin = time.time()
+        AppTest.from_file(os.path.abspath('main.py'), default_timeout=600).run()
+    # Marks are perf_counter readings; shift them onto the wall clock
+    offset = time.time() - time.perf_counter()
+    marks = instrumentation.startup_marks
+    print(*(marks[name] + offset - origin for name in ('first_paint', 'interactive')))
+
+
+def measure(scenarios=('cold', 'restart', 'prewarmed', 'warm'), repeat=3):
+    """Seconds to first paint and to interactive per scenario, best of ``repeat``.
+
+    Every start runs in a fresh process. Cold and restart are timed from
+    process launch, so imports count. A pre-warmed start is timed from the
+    end of ``prewarm``, when the server would start accepting traffic. A
+    warm start is a second session in an already warm process.
+    """
+    import subprocess
+    import sys
+
+    from data_loader import sidecar_path
+    from sql_store import store_path
+
+    results = {}
+    for scenario in scenarios:
+        runs = []
+        for _ in range(repeat):
+            if scenario == 'cold':
+                for path in (sidecar_path(FILE_PATH, SHEET_NAME), store_path(FILE_PATH, SHEET_NAME, BACKEND)):
+                    if os.path.exists(path):
+                        os.remove(path)
+            output = subprocess.run([sys.executable, __file__, '_scenario', scenario, repr(time.time())],
+                                    capture_output=True, text=True, check=True).stdout
+            runs.append([float(value) for value in output.split()[-2:]])
+        first_paint, interactive = zip(*runs)
+        results[scenario] = {'first_paint': min(first_paint), 'interactive': min(interactive)}
+    return results
+
+
+if __name__ == '__main__':
+    import sys
+
+    # main.py imports this file as ``startup``; go through that module so the
+    # caches warmed here are the ones the script reads
+    import startup
+
+    command = sys.argv[1] if len(sys.argv) > 1 else 'serve'
+    if command == 'serve':
+        from streamlit.web import cli
+
+        started = time.perf_counter()
+        startup.prewarm()
+        print(f"pre-warmed in {time.perf_counter() - started:.2f}s")
+        sys.argv = ['streamlit', 'run', 'main.py', *sys.argv[2:]]
+        sys.exit(cli.main())
+    elif command == 'measure':
+        for scenario, marks in startup.measure().items():
+            print(f"{scenario:<10} first paint {marks['first_paint']:6.3f}s  interactive {marks['interactive']:6.3f}s")
+    elif command == '_scenario':
+        startup._run_scenario(sys.argv[2], float(sys.argv[3]))
+    else:
+        sys.exit("usage: python startup.py [serve [streamlit options] | measure]")
@@ -0,0 +1,111 @@
+"""Seeded synthetic HR workbooks for scaling tests.
+
+Generates a sheet with the same Arabic headers as the real export (the keys
+of ``RENAME_DICT``) and category cardinalities in the range of a large
+hospital: about fifty departments, a dozen units, a few dozen job titles
+and resignation reasons. The same seed and size always give the same rows.
+
+    python synthetic.py 100000 --out synthetic-100k.xlsx
+"""
+import numpy as np
+import pandas as pd
+
+from data_loader import RENAME_DICT
+
+SHEET_NAME = "الدوران + معدل البقاء"
+SIZES = {'10k': 10_000, '100k': 100_000, '1M': 1_000_000}
+
+UNITS = ['التمريض', 'الطبية', 'الإدارية', 'المالية', 'الموارد البشرية', 'الصيدلية', 'المختبر',
+         'الأشعة', 'التغذية', 'الصيانة', 'تقنية المعلومات', 'خدمة المرضى']
+JOB_TITLES = ['RN', 'PN', 'موظف/ة استقبال', 'اداري', 'محاسب', 'صيدلي', 'فني مختبر', 'فني أشعة',
+              'أخصائي تغذية', 'فني صيانة', 'مبرمج', 'طبيب مقيم', 'طبيب أخصائي', 'استشاري',
+              'مساعد تمريض', 'سكرتير/ة', 'مشرف/ة', 'مدير/ة قسم', 'أخصائي علاج طبيعي', 'مسعف',
+              'موظف/ة أمن', 'عامل/ة نظافة', 'سائق', 'منسق/ة', 'مدخل/ة بيانات', 'أخصائي اجتماعي',
+              'فني تخدير', 'فني أسنان', 'طبيب أسنان', 'مراقب/ة جودة']
+REASONS = ['أسباب إجتماعية', 'أسباب متفرقة', 'ضمن فترة التجربة', 'الانتقال إلى مدينة أخرى',
+           'الحصول على عرض وظيفي أفضل', 'الراتب غير مناسب', 'ظروف صحية', 'إكمال الدراسة',
+           'ضغط العمل', 'عدم الرضا عن بيئة العمل', 'الزواج', 'رعاية الأسرة', 'التقاعد المبكر',
+           'السفر خارج البلاد', 'عدم تجديد العقد', 'ساعات العمل الطويلة', 'بعد المسافة عن العمل',
+           'خلاف مع الإدارة', 'عدم وجود فرص ترقية', 'الانتقال إلى القطاع الحكومي', 'بدء عمل خاص',
+           'أسباب عائلية', 'إنهاء خدمات', 'الحمل والولادة', 'عدم التأقلم مع نظام المناوبات']
+MARITAL_STATUSES = ['عازب/عزباء', 'متزوج/ة', 'خاطب/ة', 'مطلق/ة']
+AGE_GROUPS = [(0, 20, '20 فأقل'), (20, 25, '21-25'), (25, 35, '26-35'), (35, 45, '36-45'),
+              (45, 55, '46-55'), (55, 200, '56 فأكثر')]
+
+# Share of missing cells in the optional columns, as in hand-kept sheets
+MISSING_RATE = 0.02
+
+
+def _skewed(rng, n, k):
+    # Zipf-like weights: a few large departments and a long tail
+    weights = 1 / np.arange(1, k + 1) ** 0.8
+    return rng.choice(k, size=n, p=weights / weights.sum())
+
+
+def generate(rows, seed=0):
+    """Return a frame of ``rows`` leavers with the workbook's Arabic headers."""
+    rng = np.random.default_rng(seed)
+    departments = _skewed(rng, rows, 50) + 1
+    units = np.array(UNITS, dtype=object)[_skewed(rng, rows, len(UNITS))]
+
+    start = pd.Timestamp('2010-01-01') + pd.to_timedelta(rng.integers(0, 14 * 365, rows), unit='D')
+    # Most leavers go within the first couple of years
+    tenure_days = np.minimum(rng.exponential(700, rows).astype('int64') + 30, 14 * 365)
+    leaving = start + pd.to_timedelta(tenure_days, unit='D')
+    age_at_start = rng.normal(29, 6, rows).clip(18, 60)
+    birth = start - pd.to_timedelta((age_at_start * 365.25).astype('int64'), unit='D')
+
+    work_duration = tenure_days / 365
+    age_at_exit = (leaving - birth).days.to_numpy() / 365
+    age_group = np.full(rows, AGE_GROUPS[-1][2], dtype=object)
+    for low, high, label in reversed(AGE_GROUPS):
+        age_group[(age_at_exit > low) & (age_at_exit <= high)] = label
+    early = np.zeros(rows, dtype=object)
+    early[(work_duration >= 0.25) & (work_duration < 4.4)] = 'نعم'
+
+    columns = {
+        'الرقم': np.arange(1, rows + 1),
+        'اسم الموظف': 0,
+        'المسمى الوظيفي': np.array(JOB_TITLES, dtype=object)[_skewed(rng, rows, len(JOB_TITLES))],
+        'المسمى': np.where(rng.random(rows) < 0.6, 'RN', 'اداري'),
+        'القسم': departments,
+        'الإدارة': units,
+        'تاريخ بدء العمل': start,
+        'تاريخ الترك': leaving,
+        'الجنس': np.where(rng.random(rows) < 0.62, 'انثى', 'ذكر'),
+        'تاريخ الميلاد': birth,
+        'الحالة الاجتماعية': rng.choice(MARITAL_STATUSES, size=rows, p=[0.45, 0.4, 0.1, 0.05]),
+        'فترة العمل': work_duration,
+        'الترك قبل 4.4': early,
+        'العمر عند الترك': age_at_exit,
+        'شريحة العمر': age_group,
+        'الشهر': leaving.month,
+        'السبب': np.array(REASONS, dtype=object)[_skewed(rng, rows, len(REASONS))],
+        'Turn Over': np.where(rng.random(rows) < 0.8, 'نعم', 'كلا'),
+        'معدل المدة': np.where(rng.random(rows) < 0.7, 'نعم', 'كلا'),
+        'RN Turn Over': np.where(rng.random(rows) < 0.2, 'نعم', 'كلا'),
+    }
+    df = pd.DataFrame(columns)[list(RENAME_DICT)]
+    for col in ['الإدارة', 'الحالة الاجتماعية', 'السبب', 'فترة العمل', 'تاريخ الميلاد']:
+        df[col] = df[col].mask(rng.random(rows) < MISSING_RATE)
+    return df
+
+
+def write_workbook(path, rows, seed=0):
+    """Write a synthetic workbook with one sheet named like the real export."""
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        generate(rows, seed).to_excel(writer, sheet_name=SHEET_NAME, index=False)
+    return path
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write a seeded synthetic HR workbook.")
+    parser.add_argument('rows', help="row count or one of " + ", ".join(SIZES))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default=None)
+    args = parser.parse_args()
+
+    rows = SIZES.get(args.rows) or int(args.rows)
+    print(write_workbook(args.out or f"synthetic-{args.rows}.xlsx", rows, args.seed))
@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+# The modules live at the repository root, next to main.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='module')
+def workdir(tmp_path_factory):
+    """A fresh working directory, so ``.hr_cache/`` is written there."""
+    path = tmp_path_factory.mktemp('hr')
+    with pytest.MonkeyPatch.context() as patch:
+        patch.chdir(path)
+        yield path
@@ -0,0 +1,61 @@
+"""Every tab must come out the same from the cube and from each SQL store."""
+from importlib.util import find_spec
+
+import pandas as pd
+import pytest
+
+from charts import TAB_TITLES, build_tab
+from cube import build_cube
+from data_loader import load_data
+from filters import FilterIndex, default_selections
+from sql_store import open_store
+from synthetic import SHEET_NAME, write_workbook
+from view_cache import serialize_blocks
+
+BACKENDS = ['sqlite', pytest.param('duckdb', marks=pytest.mark.skipif(
+    find_spec('duckdb') is None, reason="duckdb is not installed"))]
+
+
+@pytest.fixture(scope='module')
+def workbook(workdir):
+    path = str(workdir / 'synthetic.xlsx')
+    write_workbook(path, 1500, seed=3)
+    return path
+
+
+@pytest.fixture(scope='module')
+def cube_source(workbook):
+    cube = build_cube(load_data(workbook, SHEET_NAME))
+    return cube, FilterIndex(cube)
+
+
+def filter_states(source):
+    defaults = default_selections(source)
+    values = source.values
+    return [
+        defaults,
+        dict(defaults, Department=values('Department')[:2]),
+        dict(defaults, Gender=values('Gender')[:1], Unit=values('Unit')[:1], AgeGroup=values('AgeGroup')[1:3]),
+        # Matches no rows
+        dict(defaults, ResignationReason=[]),
+    ]
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_tabs_match_cube(workbook, cube_source, backend):
+    cube, filter_index = cube_source
+    store = open_store(workbook, SHEET_NAME, backend)
+    for selections in filter_states(filter_index):
+        cube_view, store_view = cube[filter_index.mask(selections)], store.view(selections)
+        for index, title in enumerate(TAB_TITLES):
+            expected = serialize_blocks(build_tab(index, cube_view))
+            actual = serialize_blocks(build_tab(index, store_view))
+            assert [kind for kind, _ in actual] == [kind for kind, _ in expected], title
+            for (kind, got), (_, want) in zip(actual, expected):
+                if kind == 'table':
+                    # A store view does not carry the unused categories of the cube
+                    pd.testing.assert_frame_equal(got[0], want[0], check_categorical=False)
+                    assert got[1] == want[1]
+                elif kind != 'image':
+                    # Word cloud images are not compared; their layout is random
+                    assert got == want, title
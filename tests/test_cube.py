@@ -0,0 +1,68 @@
+"""Roll-ups of a filtered cube must equal group-bys of the filtered rows."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from cube import CUBES, MEASURES, build_cube, count_by, mean_work_duration, totals
+from data_loader import RENAME_DICT, _type_columns, compact_frame, derive_features
+from filters import FilterIndex, default_selections
+from synthetic import generate
+
+
+@pytest.fixture(scope='module')
+def rows():
+    return derive_features(compact_frame(_type_columns(generate(5000, seed=11).rename(columns=RENAME_DICT))))
+
+
+@pytest.fixture(scope='module')
+def cube(rows):
+    return build_cube(rows)
+
+
+def filtered_rows(rows, selections):
+    mask = np.ones(len(rows), dtype=bool)
+    for col, selected in selections.items():
+        if selected is not None:
+            mask &= rows[col].isin(selected).to_numpy()
+    return rows[mask]
+
+
+def states(filter_index):
+    defaults = default_selections(filter_index)
+    return [
+        {},
+        defaults,
+        dict(defaults, Department=filter_index.values('Department')[:3], Gender=filter_index.values('Gender')[:1]),
+        dict(defaults, AgeGroup=[]),
+    ]
+
+
+def test_rollups_match_rows(rows, cube):
+    filter_index = FilterIndex(cube)
+    for selections in states(filter_index):
+        view = cube[filter_index.mask(selections)]
+        expected = filtered_rows(rows, selections)
+        assert totals(view)['Count'] == len(expected)
+        assert totals(view)['Leavers'] == expected['DateOfLeaving'].notna().sum()
+        np.testing.assert_allclose(mean_work_duration(view), expected['WorkDuration'].astype('float64').mean())
+        for column in ['ResignationReason', 'JobTitle', 'BirthMonthName']:
+            counts = count_by(view, column)
+            want = expected[column].value_counts()
+            pd.testing.assert_series_equal(counts.sort_index(), want[want > 0].sort_index(),
+                                           check_names=False, check_dtype=False, check_index_type=False,
+                                           check_categorical=False)
+
+
+def test_filtered_cube_slices_only_the_frames_it_reads(cube):
+    filter_index = FilterIndex(cube)
+    view = cube[filter_index.mask({'Gender': filter_index.values('Gender')[:1]})]
+    view.rollup(['JobTitle'])
+    assert list(view._sliced) == ['profile']
+    # Repeated roll-ups reuse the slice
+    assert view.frame(['BirthMonthName']) is view.frame(['JobTitle'])
+
+
+def test_every_frame_has_its_dimensions(cube):
+    for name, dimensions in CUBES.items():
+        assert set(dimensions) | set(MEASURES) == set(cube.frames[name].columns)
+        assert cube.frames[name]['Count'].sum() == cube.frames['categories']['Count'].sum()
@@ -0,0 +1,57 @@
+"""The bitmap index must select the same rows as ``Series.isin``."""
+import numpy as np
+import pytest
+
+from cube import build_cube
+from data_loader import RENAME_DICT, _type_columns, compact_frame, derive_features
+from filters import FILTER_COLUMNS, FilterIndex, normalize
+from synthetic import generate
+
+
+@pytest.fixture(scope='module')
+def cube():
+    return build_cube(derive_features(compact_frame(_type_columns(generate(5000, seed=7).rename(columns=RENAME_DICT)))))
+
+
+def expected_mask(frame, selections):
+    mask = np.ones(len(frame), dtype=bool)
+    for col, selected in selections.items():
+        if selected is not None:
+            mask &= frame[col].isin(selected).to_numpy()
+    return mask
+
+
+def random_states(filter_index, count=40, seed=0):
+    rng = np.random.default_rng(seed)
+    for _ in range(count):
+        selections = {}
+        for col in rng.choice(FILTER_COLUMNS, size=rng.integers(1, 4), replace=False):
+            values = filter_index.values(col)
+            picked = list(rng.choice(values, size=rng.integers(0, len(values) + 1), replace=False))
+            selections[col] = picked
+        yield selections
+
+
+def test_mask_matches_isin(cube):
+    filter_index = FilterIndex(cube)
+    values = filter_index.values
+    marital = values('MaritalStatus')
+    states = list(random_states(filter_index)) + [
+        {},
+        {'Gender': None, 'Department': values('Department')[:3]},
+        # Every value, which takes the not-null shortcut
+        {'MaritalStatus': marital},
+        # One value repeated as often as the column has values is not every value
+        {'MaritalStatus': marital[:1] * len(marital)},
+        {'AgeGroup': values('AgeGroup')[:1] * 3 + values('AgeGroup')[1:2]},
+        {'ResignationReason': []},
+        {'Unit': ['not a unit']},
+    ]
+    for selections in states:
+        masks = filter_index.mask(selections)
+        for name, frame in cube.frames.items():
+            np.testing.assert_array_equal(masks[name], expected_mask(frame, selections), err_msg=f"{name} {selections}")
+
+
+def test_normalize_ignores_order_and_repeats():
+    assert normalize({'Unit': ['b', 'a', 'b'], 'Gender': None}) == normalize({'Gender': None, 'Unit': ['a', 'b']})
@@ -0,0 +1,131 @@
+"""Monthly exports must leave the same cube as building it from scratch."""
+import functools
+
+import pandas as pd
+import pytest
+
+import data_loader
+import ingest
+from cube import CUBES, MEASURES, build_cube, count_by, totals
+from filters import FILTER_COLUMNS, FilterIndex, default_selections
+from synthetic import SHEET_NAME, generate
+
+# Columns of the generated workbook, with the real Arabic headers
+ID, REASON, LEAVING, DURATION = 'الرقم', 'السبب', 'تاريخ الترك', 'فترة العمل'
+
+
+def assert_same_cube(actual, expected):
+    """Equal sums per key in every frame; row order and zero rows do not count."""
+    for name, dimensions in CUBES.items():
+        sums = []
+        for frame in (actual.frame(dimensions), expected.frame(dimensions)):
+            keys = [col for col in frame.columns if col not in MEASURES]
+            summed = frame.groupby(keys, observed=True, dropna=False)[MEASURES].sum()
+            sums.append(summed[summed['Count'] != 0].sort_index())
+        pd.testing.assert_frame_equal(*sums, check_dtype=False, check_categorical=False, rtol=1e-6, obj=name)
+
+
+def assert_same_filters(dataset, expected):
+    """The dataset's filter index offers and selects what a fresh index would."""
+    filter_index = FilterIndex(expected)
+    for column in FILTER_COLUMNS:
+        assert dataset.filter_index.values(column) == filter_index.values(column), column
+    defaults = default_selections(filter_index)
+    for selections in ({}, defaults, dict(defaults, Department=filter_index.values('Department')[:2])):
+        view = dataset.cube[dataset.filter_index.mask(selections)]
+        want = expected[filter_index.mask(selections)]
+        pd.testing.assert_series_equal(totals(view), totals(want), check_dtype=False)
+        pd.testing.assert_series_equal(count_by(view, 'ResignationReason').sort_index(),
+                                       count_by(want, 'ResignationReason').sort_index(),
+                                       check_dtype=False, check_index_type=False, check_categorical=False)
+
+
+@pytest.fixture
+def exports(workdir, monkeypatch):
+    # Small chunks, so IDs and identical anonymous rows span chunk boundaries
+    monkeypatch.setattr(ingest, 'iter_workbook_chunks',
+                        functools.partial(data_loader.iter_workbook_chunks, chunksize=300))
+    rows = generate(3000, seed=5).sort_values(LEAVING, ignore_index=True)
+    rows.loc[:29, ID] = None
+    rows = pd.concat([rows, rows.iloc[:10]], ignore_index=True)
+    path = workdir / 'exports'
+    path.mkdir()
+    return path, rows
+
+
+def test_monthly_exports_merge_into_the_cube(exports, monkeypatch):
+    path, rows = exports
+    rebuilds = []
+    dataset = ingest.IncrementalDataset(str(path), SHEET_NAME)
+    monkeypatch.setattr(dataset, '_rebuild', lambda: rebuilds.append(True))
+
+    months = rows[LEAVING].dt.to_period('M')
+    latest = sorted(months.dropna().unique())[-4:]
+    rows[months < latest[0]].to_excel(path / '0000-history.xlsx', sheet_name=SHEET_NAME, index=False)
+    dataset.refresh()
+    assert_same_cube(dataset.cube, build_cube(dataset.frame()))
+    history = dataset.cube.parts[0]
+
+    for i, month in enumerate(latest):
+        export = rows[months == month]
+        # Earlier records whose reason or (within its bucket) WorkDuration
+        # changed, and a repeat of a row in this file
+        known = rows[rows[ID].notna()]
+        changed = known.iloc[[i]].copy()
+        changed[REASON] = f"سبب {i}"
+        retimed = known.iloc[[i + 100]].copy()
+        retimed[DURATION] = retimed[DURATION] + 0.001
+        export = pd.concat([export, changed, retimed, export.iloc[:1]])
+        export.to_excel(path / f"{month}.xlsx", sheet_name=SHEET_NAME, index=False)
+        dataset.refresh()
+        assert dataset.manifest['files'][f"{month}.xlsx"]['replaced'] == 2
+        expected = build_cube(dataset.frame())
+        assert_same_cube(dataset.cube, expected)
+        assert_same_filters(dataset, expected)
+
+    assert not rebuilds
+    # The history is never regrouped; each export adds a part of its own
+    assert dataset.cube.parts[0] is history and len(dataset.cube.parts) == 1 + len(latest)
+    assert len(dataset.frame()) == len(dataset.current)
+
+
+def test_datasets_do_not_share_records(workdir):
+    for path in ('a/exports', 'b/exports'):
+        (workdir / path).mkdir(parents=True)
+    rows = generate(20, seed=2)
+    rows.to_excel(workdir / 'a/exports/2024-01.xlsx', sheet_name=SHEET_NAME, index=False)
+    first = ingest.IncrementalDataset(str(workdir / 'a/exports'), SHEET_NAME)
+    first.refresh()
+    # Same directory name elsewhere, and another sheet of the same directory
+    for data_dir, sheet in ((workdir / 'b/exports', SHEET_NAME), (workdir / 'a/exports', 'Sheet2')):
+        other = ingest.IncrementalDataset(str(data_dir), sheet)
+        assert other.root != first.root
+        assert other.cube is None and not other.current
+
+
+def test_same_id_in_several_files(workdir):
+    path = workdir / 'same-id'
+    path.mkdir()
+    rows = generate(30, seed=4)
+    start = 'تاريخ بدء العمل'
+    # Placeholder IDs, as in the bundled workbook, are not identities
+    rows.loc[:19, ID] = 0
+    rows.iloc[:10].to_excel(path / 'a.xlsx', sheet_name=SHEET_NAME, index=False)
+    rows.iloc[10:20].to_excel(path / 'b.xlsx', sheet_name=SHEET_NAME, index=False)
+    rows.loc[20, ID], rows.loc[21, ID] = 7, 8
+    rows.iloc[20:22].to_excel(path / 'c.xlsx', sheet_name=SHEET_NAME, index=False)
+    # Employee 7 is rehired and leaves again; employee 8's record is corrected
+    later = rows.iloc[20:22].copy()
+    later.loc[20, start] = later.loc[20, start] + pd.DateOffset(years=1)
+    later.loc[21, REASON] = "سبب مصحح"
+    later.to_excel(path / 'd.xlsx', sheet_name=SHEET_NAME, index=False)
+
+    dataset = ingest.IncrementalDataset(str(path), SHEET_NAME)
+    dataset.refresh()
+    files = dataset.manifest['files']
+    assert [(files[f"{name}.xlsx"]['new'], files[f"{name}.xlsx"]['replaced']) for name in 'abcd'] == [
+        (10, 0), (10, 0), (2, 0), (1, 1)]
+    frame = dataset.frame()
+    assert len(frame) == 23
+    assert (frame['ResignationReason'] == "سبب مصحح").sum() == 1
+    assert_same_cube(dataset.cube, build_cube(frame))
@@ -0,0 +1,71 @@
+"""Process-wide LRU cache of built tabs.
+
+Sessions looking at the same filter state get the same tab, so built tabs
+are stored once per process under ``(dataset version, normalized filters,
+tab, options)``. Figures are kept as Plotly JSON and tables as frames, so an
+entry is independent of the session that built it.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import plotly.io as pio
+
+VIEW_CACHE_SIZE = int(os.environ.get('HR_VIEW_CACHE_SIZE', 256))
+
+
+class ViewCache:
+    def __init__(self, maxsize=VIEW_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_build(self, key, build):
+        """Return ``(value, seconds, hit)``; ``seconds`` is the original build time.
+
+        Concurrent misses on the same key may both build; the last one wins.
+        """
+        entry = self.get(key)
+        if entry is not None:
+            return entry[0], entry[1], True
+        started = time.perf_counter()
+        value = build()
+        seconds = time.perf_counter() - started
+        self.put(key, (value, seconds))
+        return value, seconds, False
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'size': len(self._entries), 'maxsize': self.maxsize, 'hits': self.hits, 'misses': self.misses}
+
+
+def serialize_blocks(blocks):
+    """Replace figures with their JSON so the blocks can be shared."""
+    return [(kind, payload.to_json() if kind == "plotly" else payload) for kind, payload in blocks]
+
+
+def deserialize_blocks(blocks):
+    return [(kind, pio.from_json(payload) if kind == "plotly" else payload) for kind, payload in blocks]
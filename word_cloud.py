@@ -0,0 +1,83 @@
+"""Frequency-based word cloud for the resignation reasons.
+
+Each distinct reason is tokenized and reshaped for right-to-left display
+once. A filter state only sums those per-reason token counts, weighted by
+how many rows carry the reason, and the rendered PNG is cached by the
+resulting frequency vector, so the cost no longer grows with the number of
+leaver rows.
+"""
+import io
+import re
+from collections import Counter
+from functools import lru_cache
+
+import arabic_reshaper
+from bidi.algorithm import get_display
+from PIL import ImageFont
+from wordcloud import WordCloud, STOPWORDS
+
+FONT_PATH = 'arial'
+BACKGROUND_COLOR = "#e0e1dd"
+
+ARABIC_WORD = re.compile(r"[\u0600-\u06FF]+")
+custom_stopwords = set(STOPWORDS).union({'من', 'في', 'على', 'أن', 'إلى', 'عن', 'و', 'وأن'})
+
+
+@lru_cache(maxsize=None)
+def reason_tokens(reason):
+    """Reshaped token counts of one reason, computed once per distinct reason.
+
+    Tokens are matched on the raw Arabic text and only then reshaped, since
+    the reshaped presentation forms fall outside the Arabic block.
+    """
+    tokens = [token for token in ARABIC_WORD.findall(str(reason)) if token not in custom_stopwords]
+    return Counter(get_display(arabic_reshaper.reshape(token)) for token in tokens)
+
+
+def warm_reason_tokens(reasons):
+    """Tokenize every distinct reason up front (called when the data loads)."""
+    for reason in reasons:
+        reason_tokens(reason)
+
+
+def word_frequencies(reason_counts):
+    """Token frequencies for a filter state from ``{reason: row count}``."""
+    frequencies = Counter()
+    for reason, count in reason_counts.items():
+        for token, token_count in reason_tokens(reason).items():
+            frequencies[token] += token_count * int(count)
+    return frequencies
+
+
+@lru_cache(maxsize=1)
+def _font_path():
+    # Arial is not installed everywhere; DejaVu Sans ships with matplotlib
+    # and covers the Arabic presentation forms
+    try:
+        ImageFont.truetype(FONT_PATH)
+        return FONT_PATH
+    except OSError:
+        from matplotlib import font_manager
+        return font_manager.findfont('DejaVu Sans')
+
+
+@lru_cache(maxsize=32)
+def _render(frequency_items):
+    wordcloud = WordCloud(
+        font_path=_font_path(),
+        background_color=BACKGROUND_COLOR,
+        width=800,
+        height=400,
+        colormap='viridis',
+    ).generate_from_frequencies(dict(frequency_items))
+    buffer = io.BytesIO()
+    wordcloud.to_image().save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def render_png(frequencies):
+    """PNG bytes of the word cloud, cached by the frequency vector.
+
+    Raises ValueError when there are no words to draw.
+    """
+    return _render(tuple(sorted(frequencies.items())))